@@ -0,0 +1,215 @@
+"""Benchmark headless do quadro Kanban.
+
+Cada tamanho roda num processo separado (para que o pico de memória seja
+isolado), com a plataforma "offscreen" do Qt e um banco temporário populado
+com N tarefas sintéticas. O resultado é um JSON comparável entre execuções:
+
+    python benchmarks/bench_board.py --sizes 1000 10000 100000 --output bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+
+def populate(db_path, size, seed=1234):
+    from kanban_db import Database, to_epoch
+    from kanban_rank import rank_sequence
+
+    db = Database(db_path)
+    db.init_schema()
+    rng = random.Random(seed)
+    now = datetime.now()
+    # Os ids das colunas do quadro padrão
+    columns = [row['id'] for row in db.list_columns(db.get_board(None)['id'])]
+    ranks = {column: rank_sequence() for column in columns}
+
+    def rows():
+        for i in range(size):
+            created = now - timedelta(minutes=rng.randint(0, 60 * 24 * 365))
+            deadline = now + timedelta(minutes=rng.randint(-60 * 24 * 30, 60 * 24 * 90))
+            column = columns[i % len(columns)]
+            yield (
+                f"Tarefa sintética {i}",
+                f"Descrição gerada para a tarefa {i} do benchmark" if i % 3 else None,
+                column,
+                to_epoch(created),
+                to_epoch(deadline),
+                next(ranks[column]),
+            )
+
+    conn = db.connection()
+    with conn:
+        conn.executemany(
+            "INSERT INTO tasks (titulo, descricao, coluna, data_criacao, notificar_em, rank) VALUES (?, ?, ?, ?, ?, ?)",
+            rows()
+        )
+    db.close()
+
+
+def peak_rss_kb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reporta bytes; Linux reporta KiB
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def summarize(samples):
+    return {
+        'runs': len(samples),
+        'min_ms': round(min(samples) * 1000, 3),
+        'median_ms': round(statistics.median(samples) * 1000, 3),
+        'max_ms': round(max(samples) * 1000, 3),
+    }
+
+
+def run_size(size, repeat):
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "bench.db")
+        started = time.perf_counter()
+        populate(db_path, size)
+        populate_time = time.perf_counter() - started
+
+        import kanban_app
+
+        started = time.perf_counter()
+        kanban = kanban_app.KanbanApp(db_path=db_path)
+        kanban.toaster_loaded = True
+        window = kanban.window
+        app = kanban.app
+
+        def wait_idle():
+            while kanban.db_worker.pending_count():
+                app.processEvents()
+                time.sleep(0.0005)
+            app.processEvents()
+
+        def timed(action):
+            started = time.perf_counter()
+            action()
+            wait_idle()
+            return time.perf_counter() - started
+
+        # Bandeja e varredura de notificações rodam após a primeira pintura
+        while not kanban.startup_finished or not window.board_loaded:
+            app.processEvents()
+            time.sleep(0.0005)
+        wait_idle()
+        startup_time = time.perf_counter() - started
+
+        timings = {}
+        # A varredura da inicialização já marcou os prazos vencidos; aqui
+        # mede-se o custo de regime de cada verificação.
+        timings['check_for_notifications'] = summarize(
+            [timed(kanban.check_for_notifications) for _ in range(repeat)]
+        )
+        timings['load_and_display_tasks'] = summarize(
+            [timed(window.load_and_display_tasks) for _ in range(repeat)]
+        )
+
+        rng = random.Random(size)
+        # Só as tarefas carregadas (as primeiras páginas de cada coluna): as
+        # demais não estão no quadro e on_card_moved não faria nada com elas.
+        # Um card movido vai para a coluna de destino e continua carregado.
+        board = window.board
+        task_ids = [task.id for column_id in board.columns for task in board.store.column(column_id)]
+
+        def move_random():
+            task = window.find_task(rng.choice(task_ids))
+            targets = [column for column in board.columns if column != task.coluna]
+            window.on_card_moved(task.id, rng.choice(targets))
+
+        timings['on_card_moved'] = summarize([timed(move_random) for _ in range(repeat)])
+
+        deadline = datetime.now() + timedelta(days=30)
+        timings['db_insert_task'] = summarize([
+            timed(lambda: window.db_insert_task({
+                'titulo': "Tarefa inserida no benchmark",
+                'descricao': "",
+                'notificar_em': deadline,
+            }))
+            for _ in range(repeat)
+        ])
+
+        kanban.shutdown()
+
+    return {
+        'size': size,
+        'repeat': repeat,
+        'populate_s': round(populate_time, 3),
+        'startup_ms': round(startup_time * 1000, 3),
+        'first_paint_ms': round(window.first_paint_ms, 3) if window.first_paint_ms is not None else None,
+        'timings': timings,
+        'peak_rss_kb': peak_rss_kb(),
+    }
+
+
+def run_isolated(size, repeat):
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as result_file:
+        result_path = result_file.name
+    try:
+        # A saída do app (logs de notificação) é descartada; o resultado vem pelo arquivo
+        subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--worker', str(size),
+             '--repeat', str(repeat), '--result-file', result_path],
+            check=True, stdout=subprocess.DEVNULL
+        )
+        with open(result_path, encoding='utf-8') as f:
+            return json.load(f)
+    finally:
+        os.remove(result_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark headless do quadro Kanban")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help="arquivo JSON de saída (padrão: stdout)")
+    parser.add_argument('--worker', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--result-file', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker is not None:
+        result = run_size(args.worker, args.repeat)
+        with open(args.result_file, 'w', encoding='utf-8') as f:
+            json.dump(result, f)
+        return 0
+
+    report = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': [],
+    }
+    for size in args.sizes:
+        print(f"Rodando benchmark com {size} tarefas...", file=sys.stderr)
+        report['results'].append(run_isolated(size, args.repeat))
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,33 +1,77 @@
 import sys
 import os
+import argparse
+import getpass
+import hashlib
+import html
 import json
+import heapq
+import queue
 import sqlite3
-from datetime import datetime
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+# Referência para medir o tempo até a primeira pintura da janela
+STARTED_AT = time.perf_counter()
+
+from kanban_db import (
+    APP_NAME, Database, NOTIFICATION_COLUMNS, NOTIFICATION_TIERS, STATS_WEEK_SECONDS, STATS_WEEKS,
+    default_db_path, to_epoch
+)
+from kanban_metrics import METRICS_LOG_FILE_NAME, metrics, profiling_requested
+from kanban_rank import ranks_between
+from kanban_tasks import (
+    PAGE_SIZE, Task, TaskStore, load_board, load_page, load_tasks_by_id, poll_changes, replay_operation
+)
+import kanban_io
 
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
     QLabel, QSystemTrayIcon, QMenu, QSizePolicy, QFrame,
     QPushButton, QLineEdit, QTextEdit, QDialog, QFormLayout,
-    QDateTimeEdit, QDialogButtonBox, QMessageBox
+    QDateTimeEdit, QDialogButtonBox, QMessageBox, QFileDialog,
+    QTableView, QHeaderView, QAbstractItemView, QStyledItemDelegate, QStyleOptionViewItem, QStyle,
+    QRubberBand, QComboBox, QStackedWidget, QInputDialog
 )
-from PyQt6.QtGui import QIcon, QAction, QDrag
-from PyQt6.QtCore import QTimer, QDateTime, Qt, QMimeData, pyqtSignal
-
-try:
-    from win10toast import ToastNotifier
-except ImportError:
-    ToastNotifier = None
+from PyQt6.QtGui import (
+    QIcon, QAction, QDrag, QKeySequence, QPainter, QColor, QFont, QFontMetrics,
+    QCursor, QPixmap, QTextLayout, QPen
+)
+from PyQt6.QtCore import (
+    QObject, QThread, QTimer, QDateTime, Qt, QMimeData, pyqtSignal,
+    QAbstractListModel, QModelIndex, QItemSelection, QItemSelectionModel, QEvent, QRect, QRectF, QPoint, QSize,
+    QLockFile
+)
+from PyQt6.QtNetwork import QLocalServer, QLocalSocket
 
-APP_NAME = "OrganizadorDeTarefas"
 APP_TITLE = "Organizador de Tarefas"
 APP_TOOLTIP = "Organizador de Tarefas"
 
-APP_DATA_DIR = os.path.join(os.environ['APPDATA'], APP_NAME)
-os.makedirs(APP_DATA_DIR, exist_ok=True)
-KANBAN_DB_FILE = os.path.join(APP_DATA_DIR, "kanban.db")
-
 APP_ICON_FILE = "icon.ico"
 
+# flag -> (rótulo do log, título, mensagem)
+NOTIFICATION_MESSAGES = {
+    'notificado_10d': ("aviso (10D)", "Aviso: {titulo}", "Faltam 10 dias para sua tarefa."),
+    'notificado_5d': ("aviso (5D)", "Atenção: {titulo}", "Faltam 5 dias para sua tarefa."),
+    'notificado_1d': ("aviso (1D)", "Urgente: {titulo}", "Falta 1 dia para sua tarefa!"),
+    'notificado': ("notificação FINAL", "Lembrete: {titulo}", "Sua tarefa '{titulo}' está agendada para agora."),
+}
+# Vários avisos do mesmo limiar na mesma varredura viram um só: flag -> (título, mensagem)
+NOTIFICATION_SUMMARIES = {
+    'notificado_10d': ("Aviso: {count} tarefas", "Faltam 10 dias para {titulos}."),
+    'notificado_5d': ("Atenção: {count} tarefas", "Faltam 5 dias para {titulos}."),
+    'notificado_1d': ("Urgente: {count} tarefas", "Falta 1 dia para {titulos}!"),
+    'notificado': ("Lembrete: {count} tarefas", "Agendadas para agora: {titulos}."),
+}
+# Títulos citados no resumo antes de "e mais N"
+NOTIFICATION_SUMMARY_TITLES = 3
+NOTIFICATION_DURATION_S = 10
+# Uma notificação por vez, com este intervalo mínimo entre elas
+NOTIFICATION_MIN_INTERVAL_S = 2
+NOTIFICATION_QUEUE_SIZE = 16
+
 DARK_MODE_STYLESHEET = """
 QWidget {
     background-color: #2B2B2B;
@@ -37,6 +81,9 @@ QWidget {
 QMainWindow {
     background-color: #2B2B2B;
 }
+QMenuBar::item:selected, QMenu::item:selected {
+    background-color: #4A4A4A;
+}
 QFrame#KanbanColumn {
     background-color: #3C3C3C;
     border-radius: 5px;
@@ -48,23 +95,9 @@ QLabel#ColumnTitle {
     padding: 5px;
     background-color: transparent;
 }
-QFrame#TaskCard {
-    background-color: #4A4A4A;
-    border: 1px solid #555555;
-    border-radius: 5px;
-    padding: 5px;
-    min-height: 120px;
-}
-QLabel#CardTitle {
-    color: #FFFFFF;
-    font-weight: bold;
-    font-size: 14px;
-    background-color: transparent;
-}
-QLabel#CardInfo {
-    color: #DDDDDD;
-    font-size: 10px;
+QTableView#CardList {
     background-color: transparent;
+    border: none;
 }
 QPushButton#AddTaskButton {
     background-color: #0078D7;
@@ -78,30 +111,15 @@ QPushButton#AddTaskButton {
 QPushButton#AddTaskButton:hover {
     background-color: #005A9E;
 }
-QWidget#CardButtonContainer {
-    background-color: transparent;
-}
-QPushButton#EditButton {
-    background-color: #5A5A5A;
-    color: #FFFFFF;
-    border: none;
-    padding: 4px 8px;
-    font-size: 10px;
-    border-radius: 3px;
-}
-QPushButton#EditButton:hover {
-    background-color: #6A6A6A;
-}
-QPushButton#DeleteButton {
-    background-color: #C42B1C;
-    color: #FFFFFF;
-    border: none;
-    padding: 4px 8px;
-    font-size: 10px;
-    border-radius: 3px;
+QLabel#MetricsOverlay {
+    background-color: rgba(0, 0, 0, 200);
+    color: #9FE870;
+    border-radius: 4px;
+    padding: 6px;
 }
-QPushButton#DeleteButton:hover {
-    background-color: #A42B1C;
+QLineEdit#SearchEdit {
+    padding: 6px;
+    font-size: 13px;
 }
 QDialog {
     background-color: #2B2B2B;
@@ -177,27 +195,15 @@ class BaseTaskDialog(QDialog):
             "notificar_em": self.datetime_edit.dateTime().toPyDateTime()
         }
 
-    def set_data(self, data):
-        self.titulo_edit.setText(data.get('titulo', ''))
-        self.desc_edit.setPlainText(data.get('descricao', ''))
+    def set_data(self, task):
+        self.titulo_edit.setText(task.titulo)
+        self.desc_edit.setPlainText(task.descricao or '')
         
-        notificar_em = data.get('notificar_em')
-        if not notificar_em:
-            notificar_em = QDateTime.currentDateTime()
-        elif isinstance(notificar_em, str):
-            try:
-                if '.' in notificar_em:
-                    notificar_em = notificar_em.split('.')[0]
-                notificar_em = QDateTime.fromString(notificar_em, "yyyy-MM-dd HH:mm:ss")
-            except:
-                 notificar_em = QDateTime.currentDateTime()
-        elif isinstance(notificar_em, datetime):
-            notificar_em = QDateTime(notificar_em)
-        
-        if not notificar_em.isValid() or notificar_em.isNull():
-             notificar_em = QDateTime.currentDateTime()
-             
-        self.datetime_edit.setDateTime(notificar_em)
+        # O prazo já chega interpretado no Task
+        if task.deadline is None:
+            self.datetime_edit.setDateTime(QDateTime.currentDateTime())
+        else:
+            self.datetime_edit.setDateTime(QDateTime(task.deadline))
 
 class NewTaskDialog(BaseTaskDialog):
     def __init__(self, parent=None):
@@ -205,107 +211,680 @@ class NewTaskDialog(BaseTaskDialog):
         self.setWindowTitle("Criar Nova Tarefa")
 
 class EditTaskDialog(BaseTaskDialog):
-    def __init__(self, task_data, parent=None):
+    def __init__(self, task, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Editar Tarefa")
-        self.set_data(task_data)
+        self.set_data(task)
+
+TASK_ROLE = Qt.ItemDataRole.UserRole + 1
+TASK_MIME_TYPE = "application/x-kanban-task-id"
+
+# Altura fixa do card: as linhas da view têm tamanho fixo e o custo de
+# layout não depende do número de tarefas na coluna.
+CARD_HEIGHT = 120
+CARD_SPACING = 5
+CARD_PADDING = 8
+DESCRIPTION_MAX_LINES = 2
+SEARCH_DEBOUNCE_MS = 150
+# Intervalo da verificação de mudanças feitas por outras instâncias; com a
+# janela oculta (na bandeja ou minimizada) o ciclo fica longo, como o antigo
+# de um minuto, só para que prazos gravados por scripts ainda sejam agendados
+SYNC_POLL_MS = 1000
+SYNC_HIDDEN_POLL_MS = 60 * 1000
+# Até este número de mudanças os cards são atualizados um a um (seleção e
+# rolagem ficam onde estão); acima, um único reset por coluna afetada
+SYNC_INCREMENTAL_LIMIT = 50
+METRICS_FLUSH_INTERVAL_MS = 60 * 1000
+METRICS_OVERLAY_REFRESH_MS = 1000
+METRICS_OVERLAY_ROWS = 14
+STATUS_MESSAGE_MS = 5000
+# Painel de estatísticas: largura máxima das barras (em caracteres) e as
+# faixas do histograma de lead time (limite inferior em dias, rótulo)
+STATS_BAR_WIDTH = 24
+LEAD_TIME_BINS = (
+    (0, "Mesmo dia"),
+    (1, "1 dia"),
+    (2, "2 a 3 dias"),
+    (4, "4 a 7 dias"),
+    (8, "1 a 2 semanas"),
+    (15, "15 a 30 dias"),
+    (31, "Mais de 30 dias"),
+)
+IMPORT_EXPORT_FILTERS = "CSV (*.csv);;JSON Lines (*.jsonl *.ndjson)"
+
+# Retrato das primeiras tarefas de cada coluna, pintado na abertura até a
+# consulta real terminar
+SNAPSHOT_FILE_SUFFIX = ".snapshot.json"
+SNAPSHOT_VERSION = 5
+SNAPSHOT_ROWS_PER_COLUMN = 30
+# Bandeja e varredura de notificações rodam após a primeira pintura; este é
+# o prazo máximo caso a janela não seja pintada (ex.: iniciada minimizada)
+STARTUP_DEFER_MAX_MS = 1000
+
+# Instância única: o primeiro processo segura um QLockFile ao lado do banco e
+# atende um QLocalServer; um novo lançamento só entrega o comando a ele
+INSTANCE_LOCK_SUFFIX = ".lock"
+INSTANCE_CONNECT_TIMEOUT_MS = 500
+INSTANCE_CONNECT_ATTEMPTS = 6
+SHOW_COMMAND = {'command': 'show'}
+
+# Tarefas em "Feito" há mais de N dias vão para o arquivo (0 desliga)
+ARCHIVE_DAYS_ENV = "KANBAN_ARCHIVE_DAYS"
+ARCHIVE_AFTER_DAYS = 30
+ARCHIVE_INTERVAL_MS = 60 * 60 * 1000
+
+# Layouts de card preparados mantidos por coluna (algumas telas de cards)
+CARD_POOL_SIZE = 256
+# Quadros renderizados mantidos em memória (LRU): voltar a um deles é
+# instantâneo; os demais são descartados e recarregados quando abertos
+BOARD_CACHE_SIZE = 3
+
+# (rótulo, deslocamento) oferecidos em "Adiar prazo" no menu de cards selecionados
+DEADLINE_SHIFTS = (
+    ("+1 dia", timedelta(days=1)),
+    ("+1 semana", timedelta(weeks=1)),
+    ("-1 dia", timedelta(days=-1)),
+)
+
+CARD_COLOR = QColor("#4A4A4A")
+CARD_BORDER_COLOR = QColor("#555555")
+CARD_SELECTED_BORDER_COLOR = QColor("#0078D7")
+CARD_TITLE_COLOR = QColor("#FFFFFF")
+CARD_INFO_COLOR = QColor("#DDDDDD")
+CARD_BUTTONS = (
+    ("Editar", QColor("#5A5A5A"), QColor("#6A6A6A")),
+    ("Excluir", QColor("#C42B1C"), QColor("#A42B1C")),
+)
+
+def board_snapshot_path(db_path):
+    return os.path.splitext(db_path)[0] + SNAPSHOT_FILE_SUFFIX
+
+
+def load_board_snapshot(path):
+    # (quadro, colunas, tarefas) do último quadro aberto
+    try:
+        with open(path, encoding='utf-8') as f:
+            snapshot = json.load(f)
+        if snapshot.get('version') != SNAPSHOT_VERSION:
+            return None
+        return snapshot['board'], snapshot['columns'], [Task.from_row(task) for task in snapshot['tasks']]
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def save_board_snapshot(path, snapshot):
+    board, columns, tasks = snapshot
+    temp_path = path + ".tmp"
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': SNAPSHOT_VERSION,
+                'board': board,
+                'columns': columns,
+                'tasks': [task.to_dict() for task in tasks],
+            }, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+    except OSError as e:
+        print(f"Erro ao salvar retrato do quadro: {e}")
+
+
+def instance_server_name(db_path):
+    # Um canal por usuário e por banco (testes e benchmarks usam bancos próprios)
+    key = f"{getpass.getuser()}|{os.path.normcase(os.path.abspath(db_path))}"
+    return f"{APP_NAME}-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]}"
+
+
+def parse_instance_command(argv):
+    parser = argparse.ArgumentParser(prog="kanban_app", description=APP_TITLE)
+    parser.add_argument('--add', nargs='?', const='', metavar='TITULO',
+                        help="abre o diálogo de nova tarefa (na instância já aberta, se houver)")
+    # O que sobrar fica para o Qt (ex.: -platform)
+    args, _ = parser.parse_known_args(argv)
+    if args.add is not None:
+        return {'command': 'add', 'titulo': args.add}
+    return SHOW_COMMAND
+
+
+def archive_after_days():
+    value = os.environ.get(ARCHIVE_DAYS_ENV)
+    if not value:
+        return ARCHIVE_AFTER_DAYS
+    try:
+        return int(value)
+    except ValueError:
+        print(f"Valor inválido em {ARCHIVE_DAYS_ENV}: {value!r}; usando {ARCHIVE_AFTER_DAYS} dias.")
+        return ARCHIVE_AFTER_DAYS
+
+
+def task_ids_to_mime(task_ids):
+    mime_data = QMimeData()
+    mime_data.setData(TASK_MIME_TYPE, ",".join(str(task_id) for task_id in task_ids).encode())
+    return mime_data
 
-class TaskCard(QFrame):
+def task_ids_from_mime(mime_data):
+    if not mime_data.hasFormat(TASK_MIME_TYPE):
+        return []
+    return [int(task_id) for task_id in bytes(mime_data.data(TASK_MIME_TYPE)).decode().split(",")]
+
+class TaskListModel(QAbstractListModel):
+    # (id da coluna, sort_key da última tarefa lida do banco)
+    page_requested = pyqtSignal(int, object)
+    # As tarefas vêm da coluna do TaskStore compartilhado; _rows é o que a view
+    # enxerga: a própria lista da coluna ou, durante uma busca, só os
+    # resultados em ordem de ranking.
+    def __init__(self, store, column_id, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.column_id = column_id
+        self._rows = store.column(column_id)
+        self._filter = None
+        self._filter_ids = None
+        # Paginação por chave: page_cursor é a última tarefa lida do banco,
+        # não a última da lista (cards movidos para cá entram fora de ordem)
+        self.has_more = False
+        self.page_cursor = None
+        self.page_pending = False
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        task = self._rows[index.row()]
+        if role == TASK_ROLE:
+            return task
+        if role == Qt.ItemDataRole.DisplayRole:
+            return task.titulo
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return task.descricao or None
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.ItemIsDropEnabled
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsDragEnabled
+
+    def reset(self):
+        # Chamado depois de TaskStore.load
+        self.begin_batch()
+        self.end_batch()
+
+    def begin_batch(self):
+        # Operações em lote mexem no store entre begin_batch e end_batch: a
+        # view recebe um único reset em vez de um sinal por linha.
+        self.beginResetModel()
+
+    def end_batch(self):
+        self._refresh_rows()
+        self.endResetModel()
+
+    @property
+    def is_filtered(self):
+        return self._filter is not None
+
+    def set_filter(self, ranked_ids):
+        self.beginResetModel()
+        self._filter = ranked_ids
+        self._filter_ids = None if ranked_ids is None else set(ranked_ids)
+        self._refresh_rows()
+        self.endResetModel()
+
+    def _refresh_rows(self):
+        if self._filter is None:
+            self._rows = self.store.column(self.column_id)
+            return
+        self._rows = []
+        for task_id in self._filter:
+            task = self.store.get(task_id)
+            if task is not None and task.coluna == self.column_id:
+                self._rows.append(task)
+
+    def set_paging(self, page):
+        # Chamado com a primeira página, depois de um recarregamento completo
+        self.has_more = len(page) >= PAGE_SIZE
+        self.page_cursor = page[-1].sort_key if page else None
+        self.page_pending = False
+
+    def canFetchMore(self, parent=QModelIndex()):
+        # Com busca ativa a view não pede páginas: só os resultados aparecem
+        return not parent.isValid() and self.has_more and not self.page_pending and self._filter is None
+
+    def fetchMore(self, parent=QModelIndex()):
+        # A view chama ao rolar até o fim; a página chega depois, em append_page
+        if self.canFetchMore(parent):
+            self.page_pending = True
+            self.page_requested.emit(self.column_id, self.page_cursor)
+
+    def append_page(self, page):
+        self.page_pending = False
+        self.has_more = len(page) >= PAGE_SIZE
+        if page:
+            self.page_cursor = page[-1].sort_key
+        # Tarefas que já estão no quadro (movidas para cá ou trazidas pela busca) são ignoradas
+        tasks = [task for task in page if self.store.get(task.id) is None]
+        if not tasks:
+            return
+        if self._filter is not None:
+            for task in tasks:
+                self.store.add(task)
+            return
+        
+        # A página vem em ordem: as tarefas que caem antes da última da lista
+        # entram uma a uma e o resto (o caso comum, a página inteira) vai
+        # para o fim num único sinal
+        rows = self.store.column(self.column_id)
+        first = 0
+        while first < len(tasks) and rows and tasks[first].sort_key < rows[-1].sort_key:
+            self.insert_task(tasks[first])
+            first += 1
+        if first < len(tasks):
+            self.beginInsertRows(QModelIndex(), len(rows), len(rows) + len(tasks) - first - 1)
+            for task in tasks[first:]:
+                self.store.add(task)
+            self.endInsertRows()
+
+    def is_unloaded(self, task):
+        # Tarefa que ainda vai chegar por uma página
+        return self.has_more and self.page_cursor is not None and task.sort_key > self.page_cursor
+
+    def leading_tasks(self, count):
+        return self.store.column(self.column_id)[:count]
+
+    def task_at(self, row):
+        return self._rows[row]
+
+    def row_of(self, task_id):
+        task = self.store.get(task_id)
+        if task is None or task.coluna != self.column_id:
+            return -1
+        if self._filter is not None:
+            return self._rows.index(task) if task_id in self._filter_ids else -1
+        return self.store.position(task)
+
+    def insert_task(self, task):
+        if self._filter is not None:
+            self._update_filtered(task.id, lambda: self.store.add(task))
+            return
+        
+        row = self.store.position(task)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.store.add(task)
+        self.endInsertRows()
+
+    def remove_task(self, task_id):
+        task = self.store.get(task_id)
+        if task is None or task.coluna != self.column_id:
+            return None
+        if self._filter is not None:
+            self._update_filtered(task_id, lambda: self.store.discard(task_id))
+            return task
+        
+        row = self.store.position(task)
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self.store.discard(task_id)
+        self.endRemoveRows()
+        return task
+
+    def _update_filtered(self, task_id, change):
+        # Com busca ativa só os resultados estão visíveis; tarefas fora dele
+        # mudam apenas no store, sem notificar a view.
+        visible = task_id in self._filter_ids
+        if visible:
+            self.beginResetModel()
+        change()
+        if visible:
+            self._refresh_rows()
+            self.endResetModel()
+
+class CardLayout:
+    __slots__ = ('task', 'width', 'title', 'description_lines', 'deadline')
+
+class CardRenderPool:
+    # Pool de layouts de card reutilizáveis: título elidido, descrição já
+    # quebrada em linhas e prazo formatado. Um layout é reaproveitado enquanto
+    # a tarefa e a largura não mudam, e os que saem de uso voltam para a lista
+    # livre para serem religados a outra tarefa no próximo paint.
+    def __init__(self, delegate, capacity=CARD_POOL_SIZE):
+        self.delegate = delegate
+        self.capacity = capacity
+        self._active = OrderedDict()
+        self._free = []
+
+    def acquire(self, task, width):
+        layout = self._active.get(task.id)
+        if layout is None:
+            layout = self._free.pop() if self._free else CardLayout()
+            self._bind(layout, task, width)
+            self._active[task.id] = layout
+            if len(self._active) > self.capacity:
+                self._free.append(self._active.popitem(last=False)[1])
+        else:
+            if layout.task is not task or layout.width != width:
+                self._bind(layout, task, width)
+            self._active.move_to_end(task.id)
+        return layout
+
+    def clear(self):
+        self._free.extend(self._active.values())
+        self._active.clear()
+
+    def _bind(self, layout, task, width):
+        metrics.incr("render.layout_bind")
+        delegate = self.delegate
+        layout.task = task
+        layout.width = width
+        layout.title = delegate.title_metrics.elidedText(task.titulo, Qt.TextElideMode.ElideRight, width)
+        layout.description_lines = self._wrap(task.descricao or '', width)
+        layout.deadline = f"📅 Prazo Final: {task.deadline_text}" if task.deadline_text else ''
+
+    def _wrap(self, text, width):
+        if not text:
+            return ()
+        
+        text = text.replace('\n', '\u2028')
+        text_layout = QTextLayout(text, self.delegate.info_font)
+        text_layout.beginLayout()
+        lines = []
+        last_start = 0
+        while len(lines) < DESCRIPTION_MAX_LINES:
+            line = text_layout.createLine()
+            if not line.isValid():
+                break
+            line.setLineWidth(width)
+            last_start = line.textStart()
+            lines.append(text[last_start:last_start + line.textLength()].replace('\u2028', ' ').rstrip())
+        remainder = text_layout.createLine().isValid()
+        text_layout.endLayout()
+        
+        if remainder and lines:
+            rest = text[last_start:].replace('\u2028', ' ')
+            lines[-1] = self.delegate.info_metrics.elidedText(rest, Qt.TextElideMode.ElideRight, width)
+        return tuple(lines)
+
+class TaskCardDelegate(QStyledItemDelegate):
+    # Pinta o card direto no viewport: nenhum widget é criado por tarefa,
+    # só as linhas visíveis chegam a paint().
     edit_requested = pyqtSignal(int)
     delete_requested = pyqtSignal(int)
 
-    def __init__(self, task_data, parent=None):
+    def __init__(self, parent=None):
         super().__init__(parent)
-        self.task_data = task_data
+        self.title_font = QFont("Arial")
+        self.title_font.setPixelSize(14)
+        self.title_font.setBold(True)
+        self.info_font = QFont("Arial")
+        self.info_font.setPixelSize(10)
         
-        self.setFrameShape(QFrame.Shape.StyledPanel)
-        self.setFrameShadow(QFrame.Shadow.Raised)
-        self.setLineWidth(1)
-        self.setObjectName("TaskCard")
-        
-        layout = QVBoxLayout()
-        
-        self.titulo_label = QLabel(self.task_data['titulo'])
-        self.titulo_label.setObjectName("CardTitle")
-        layout.addWidget(self.titulo_label)
-        
-        if self.task_data.get('descricao'):
-            desc_label = QLabel(self.task_data['descricao'])
-            desc_label.setWordWrap(True)
-            desc_label.setObjectName("CardInfo")
-            layout.addWidget(desc_label)
-        
-        if self.task_data.get('notificar_em'):
-            data_notificacao_str = self.task_data['notificar_em']
-            data_str = ""
-            if data_notificacao_str:
-                try:
-                    if '.' in data_notificacao_str:
-                        data_notificacao_str = data_notificacao_str.split('.')[0]
-                    data_notificacao_obj = datetime.strptime(data_notificacao_str, "%Y-%m-%d %H:%M:%S")
-                    data_str = data_notificacao_obj.strftime('%d/%m/%Y %H:%M')
-                except ValueError:
-                    data_str = "Data inválida"
-            
-            if data_str:
-                notif_label = QLabel(f"📅 Prazo Final: {data_str}")
-                notif_label.setObjectName("CardInfo")
-                layout.addWidget(notif_label)
+        self.title_metrics = QFontMetrics(self.title_font)
+        self.info_metrics = QFontMetrics(self.info_font)
         
-        layout.addStretch()
+        self.button_height = self.info_metrics.height() + 8
+        self.edit_button_width = self.info_metrics.horizontalAdvance("Editar") + 16
+        self.delete_button_width = self.info_metrics.horizontalAdvance("Excluir") + 16
         
-        button_container = QWidget(self)
-        button_container.setObjectName("CardButtonContainer")
-        button_layout = QHBoxLayout(button_container)
-        button_layout.setContentsMargins(0,0,0,0)
-        button_layout.addStretch()
+        self.pool = CardRenderPool(self)
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), CARD_HEIGHT + CARD_SPACING)
+
+    def card_rect(self, rect):
+        return rect.adjusted(0, 0, -1, -CARD_SPACING - 1)
+
+    def button_rects(self, rect):
+        card = self.card_rect(rect)
+        top = card.bottom() - CARD_PADDING - self.button_height + 1
+        delete_rect = QRect(
+            card.right() - CARD_PADDING - self.delete_button_width + 1, top,
+            self.delete_button_width, self.button_height
+        )
+        edit_rect = QRect(
+            delete_rect.left() - 6 - self.edit_button_width, top,
+            self.edit_button_width, self.button_height
+        )
+        return edit_rect, delete_rect
+
+    def paint(self, painter, option, index):
+        task = index.data(TASK_ROLE)
+        if task is None:
+            return
+        with metrics.span("render.paint_card"):
+            self.paint_card(painter, option, task)
+
+    def paint_card(self, painter, option, task):
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
         
-        edit_button = QPushButton("Editar")
-        edit_button.setObjectName("EditButton")
-        edit_button.setCursor(Qt.CursorShape.PointingHandCursor)
-        edit_button.clicked.connect(self.on_edit_clicked)
+        card = self.card_rect(option.rect)
+        selected = bool(option.state & QStyle.StateFlag.State_Selected)
+        painter.setPen(CARD_SELECTED_BORDER_COLOR if selected else CARD_BORDER_COLOR)
+        painter.setBrush(CARD_COLOR)
+        painter.drawRoundedRect(QRectF(card).adjusted(0.5, 0.5, -0.5, -0.5), 5, 5)
         
-        delete_button = QPushButton("Excluir")
-        delete_button.setObjectName("DeleteButton")
-        delete_button.setCursor(Qt.CursorShape.PointingHandCursor)
-        delete_button.clicked.connect(self.on_delete_clicked)
+        content = card.adjusted(CARD_PADDING, CARD_PADDING, -CARD_PADDING, -CARD_PADDING)
+        layout = self.pool.acquire(task, content.width())
+        left = content.left()
+        y = content.top()
         
-        button_layout.addWidget(edit_button)
-        button_layout.addWidget(delete_button)
-        layout.addWidget(button_container)
+        painter.setFont(self.title_font)
+        painter.setPen(CARD_TITLE_COLOR)
+        title_height = self.title_metrics.height()
+        painter.drawText(left, y + self.title_metrics.ascent(), layout.title)
+        y += title_height + 4
         
-        self.setLayout(layout)
+        painter.setFont(self.info_font)
+        painter.setPen(CARD_INFO_COLOR)
+        line_height = self.info_metrics.lineSpacing()
+        ascent = self.info_metrics.ascent()
+        if layout.description_lines:
+            for line in layout.description_lines:
+                painter.drawText(left, y + ascent, line)
+                y += line_height
+            y += line_height * (DESCRIPTION_MAX_LINES - len(layout.description_lines)) + 2
+        
+        if layout.deadline:
+            painter.drawText(left, y + ascent, layout.deadline)
+        
+        hover_pos = None
+        if option.state & QStyle.StateFlag.State_MouseOver and option.widget is not None:
+            hover_pos = option.widget.mapFromGlobal(QCursor.pos())
+        
+        for rect, (text, color, hover_color) in zip(self.button_rects(option.rect), CARD_BUTTONS):
+            hovered = hover_pos is not None and rect.contains(hover_pos)
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(hover_color if hovered else color)
+            painter.drawRoundedRect(QRectF(rect), 3, 3)
+            painter.setPen(CARD_TITLE_COLOR)
+            painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, text)
+        
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if (event.type() == QEvent.Type.MouseButtonRelease
+                and event.button() == Qt.MouseButton.LeftButton):
+            task = index.data(TASK_ROLE)
+            edit_rect, delete_rect = self.button_rects(option.rect)
+            pos = event.position().toPoint()
+            # Emissão adiada: o diálogo modal não deve rodar dentro do evento da view
+            if edit_rect.contains(pos):
+                QTimer.singleShot(0, lambda: self.edit_requested.emit(task.id))
+                return True
+            if delete_rect.contains(pos):
+                QTimer.singleShot(0, lambda: self.delete_requested.emit(task.id))
+                return True
+        return super().editorEvent(event, model, option, index)
+
+    def render_card(self, option, index):
+        pixmap = QPixmap(option.rect.size())
+        pixmap.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(pixmap)
+        card_option = QStyleOptionViewItem(option)
+        card_option.rect = QRect(QPoint(0, 0), option.rect.size())
+        card_option.state &= ~QStyle.StateFlag.State_MouseOver
+        self.paint(painter, card_option, index)
+        painter.end()
+        return pixmap
+
+class TaskListView(QTableView):
+    # Tabela de uma coluna com cabeçalho vertical de tamanho fixo: inserir ou
+    # remover uma linha não força o relayout de todas as outras, ao contrário
+    # do QListView (que recalcula a posição de cada item).
+    # (ids, linha de destino na view)
+    tasks_dropped = pyqtSignal(list, int)
 
-    def on_edit_clicked(self):
-        self.edit_requested.emit(self.task_data['id'])
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setObjectName("CardList")
+        self.setFrameShape(QFrame.Shape.NoFrame)
+        self.setShowGrid(False)
+        self.setWordWrap(False)
+        self.setCornerButtonEnabled(False)
+        self.horizontalHeader().hide()
+        self.horizontalHeader().setStretchLastSection(True)
+        self.verticalHeader().hide()
+        self.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.verticalHeader().setDefaultSectionSize(CARD_HEIGHT + CARD_SPACING)
+        self.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        # Ctrl/Shift estendem a seleção; arrastar a partir da área vazia
+        # seleciona por retângulo
+        self.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.setDragDropMode(QAbstractItemView.DragDropMode.DragDrop)
+        self.setDragEnabled(True)
+        self.setAcceptDrops(True)
+        self.setDropIndicatorShown(False)
+        self.setMouseTracking(True)
+        self.rubber_band = QRubberBand(QRubberBand.Shape.Rectangle, self.viewport())
+        self.rubber_band_origin = None
+        self.drop_row = None
+
+    def selected_task_ids(self):
+        rows = sorted(index.row() for index in self.selectionModel().selectedRows())
+        return [self.model().index(row, 0).data(TASK_ROLE).id for row in rows]
 
-    def on_delete_clicked(self):
-        self.delete_requested.emit(self.task_data['id'])
+    def mousePressEvent(self, e):
+        if e.button() == Qt.MouseButton.LeftButton and not self.indexAt(e.position().toPoint()).isValid():
+            self.rubber_band_origin = e.position().toPoint()
+            self.rubber_band.setGeometry(QRect(self.rubber_band_origin, QSize()))
+            self.rubber_band.show()
+        super().mousePressEvent(e)
 
     def mouseMoveEvent(self, e):
-        if e.buttons() != Qt.MouseButton.LeftButton:
+        if self.rubber_band_origin is None:
+            super().mouseMoveEvent(e)
             return
+        rect = QRect(self.rubber_band_origin, e.position().toPoint()).normalized()
+        self.rubber_band.setGeometry(rect)
+        self.select_rows_in(rect)
+
+    def select_rows_in(self, rect):
+        # O QTableView só seleciona por arraste quando os dois cantos caem
+        # sobre células; aqui a área vazia abaixo do último card conta como
+        # a última linha.
+        model = self.model()
+        top = self.rowAt(rect.top())
+        if top < 0:
+            self.selectionModel().clearSelection()
+            return
+        bottom = self.rowAt(rect.bottom())
+        if bottom < 0:
+            bottom = model.rowCount() - 1
+        self.selectionModel().select(
+            QItemSelection(model.index(top, 0), model.index(bottom, 0)),
+            QItemSelectionModel.SelectionFlag.ClearAndSelect | QItemSelectionModel.SelectionFlag.Rows
+        )
+
+    def mouseReleaseEvent(self, e):
+        if self.rubber_band_origin is not None:
+            self.rubber_band_origin = None
+            self.rubber_band.hide()
+        super().mouseReleaseEvent(e)
 
+    def startDrag(self, supported_actions):
+        index = self.currentIndex()
+        task = index.data(TASK_ROLE)
+        if task is None:
+            return
+        
+        # Arrastar um card selecionado leva a seleção inteira junto
+        task_ids = self.selected_task_ids()
+        if task.id not in task_ids:
+            task_ids = [task.id]
+        mime_data = task_ids_to_mime(task_ids)
+        
+        option = QStyleOptionViewItem()
+        self.initViewItemOption(option)
+        option.rect = self.visualRect(index)
+        
         drag = QDrag(self)
-        mime_data = QMimeData()
-        mime_data.setText(str(self.task_data['id']))
         drag.setMimeData(mime_data)
-        drag.setPixmap(self.grab()) 
-        
-        self.hide() 
-        drop_action = drag.exec(Qt.DropAction.MoveAction)
+        drag.setPixmap(self.itemDelegate().render_card(option, index))
+        drag.setHotSpot(self.viewport().mapFromGlobal(QCursor.pos()) - option.rect.topLeft())
+        drag.exec(Qt.DropAction.MoveAction)
+
+    def dragEnterEvent(self, e):
+        if e.mimeData().hasFormat(TASK_MIME_TYPE):
+            e.acceptProposedAction()
 
-        if drop_action == Qt.DropAction.MoveAction:
-            self.deleteLater()
+    def dragMoveEvent(self, e):
+        if e.mimeData().hasFormat(TASK_MIME_TYPE):
+            e.acceptProposedAction()
+            self.set_drop_row(self.row_for_drop(e.position().toPoint()))
+
+    def dragLeaveEvent(self, e):
+        self.set_drop_row(None)
+
+    def dropEvent(self, e):
+        self.set_drop_row(None)
+        task_ids = task_ids_from_mime(e.mimeData())
+        if task_ids:
+            self.tasks_dropped.emit(task_ids, self.row_for_drop(e.position().toPoint()))
+            e.acceptProposedAction()
+
+    def row_for_drop(self, pos):
+        # Metade de cima do card insere antes dele; metade de baixo, depois
+        row = self.rowAt(pos.y())
+        if row < 0:
+            return self.model().rowCount()
+        rect = self.visualRect(self.model().index(row, 0))
+        return row + 1 if pos.y() > rect.center().y() else row
+
+    def set_drop_row(self, row):
+        if row != self.drop_row:
+            self.drop_row = row
+            self.viewport().update()
+
+    def paintEvent(self, e):
+        super().paintEvent(e)
+        if self.drop_row is None:
+            return
+        if self.drop_row < self.model().rowCount():
+            y = self.rowViewportPosition(self.drop_row) - CARD_SPACING // 2
+        elif self.drop_row:
+            y = self.rowViewportPosition(self.drop_row - 1) + CARD_HEIGHT + CARD_SPACING // 2
         else:
-            self.show()
+            y = CARD_SPACING // 2
+        painter = QPainter(self.viewport())
+        painter.setPen(QPen(CARD_SELECTED_BORDER_COLOR, 2))
+        painter.drawLine(0, y, self.viewport().width(), y)
+        painter.end()
 
 class KanbanColumn(QFrame):
-    card_dropped = pyqtSignal(int, str)
+    # (ids, coluna de destino, linha de destino)
+    cards_dropped = pyqtSignal(list, int, int)
+    edit_requested = pyqtSignal(int)
+    delete_requested = pyqtSignal(int)
+    delete_selected_requested = pyqtSignal(list)
+    selection_menu_requested = pyqtSignal(list, QPoint)
+    column_menu_requested = pyqtSignal(int, QPoint)
     
-    def __init__(self, title, column_id, parent=None):
+    def __init__(self, title, column_id, store, conclui=0, parent=None):
         super().__init__(parent)
         self.column_id = column_id
+        self.conclui = conclui
         
         self.setFrameShape(QFrame.Shape.StyledPanel)
         self.setObjectName("KanbanColumn")
@@ -316,43 +895,487 @@ class KanbanColumn(QFrame):
         
         self.title_label = QLabel(title)
         self.title_label.setObjectName("ColumnTitle")
+        self.title_label.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.title_label.customContextMenuRequested.connect(
+            lambda pos: self.column_menu_requested.emit(self.column_id, self.title_label.mapToGlobal(pos))
+        )
         self.layout.addWidget(self.title_label)
         
-        self.card_container = QWidget()
-        self.card_layout = QVBoxLayout()
-        self.card_layout.setContentsMargins(0,0,0,0)
-        self.card_layout.setSpacing(5)
-        self.card_container.setLayout(self.card_layout)
+        self.model = TaskListModel(store, column_id, self)
+        self.delegate = TaskCardDelegate(self)
+        self.view = TaskListView(self)
+        self.view.setModel(self.model)
+        self.view.setItemDelegate(self.delegate)
+        self.layout.addWidget(self.view)
         
-        self.layout.addWidget(self.card_container)
-        self.layout.addStretch()
+        self.view.tasks_dropped.connect(self.on_tasks_dropped)
+        self.view.doubleClicked.connect(lambda index: self.edit_requested.emit(index.data(TASK_ROLE).id))
+        self.delegate.edit_requested.connect(self.edit_requested)
+        self.delegate.delete_requested.connect(self.delete_requested)
+        
+        self.view.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.view.customContextMenuRequested.connect(self.on_context_menu)
+        
+        delete_action = QAction("Excluir selecionadas", self.view)
+        delete_action.setShortcut(QKeySequence(QKeySequence.StandardKey.Delete))
+        delete_action.setShortcutContext(Qt.ShortcutContext.WidgetShortcut)
+        delete_action.triggered.connect(self.on_delete_selected)
+        self.view.addAction(delete_action)
         
         self.setLayout(self.layout)
         self.setAcceptDrops(True)
 
-    def add_card(self, card_widget):
-        self.card_layout.addWidget(card_widget)
+    def reload(self):
+        self.delegate.pool.clear()
+        self.model.reset()
+
+    def on_tasks_dropped(self, task_ids, row):
+        self.cards_dropped.emit(task_ids, self.column_id, row)
 
-    def clear_cards(self):
-        while self.card_layout.count():
-            child = self.card_layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
+    def on_delete_selected(self):
+        task_ids = self.view.selected_task_ids()
+        if task_ids:
+            self.delete_selected_requested.emit(task_ids)
+
+    def on_context_menu(self, pos):
+        index = self.view.indexAt(pos)
+        if not index.isValid():
+            return
+        # Clique direito fora da seleção passa a valer só para o card clicado
+        if not self.view.selectionModel().isSelected(index):
+            self.view.selectionModel().select(
+                index,
+                QItemSelectionModel.SelectionFlag.ClearAndSelect | QItemSelectionModel.SelectionFlag.Rows
+            )
+        self.selection_menu_requested.emit(self.view.selected_task_ids(), self.view.viewport().mapToGlobal(pos))
 
     def dragEnterEvent(self, e):
-        if e.mimeData().hasText() and isinstance(e.source(), TaskCard):
+        if e.mimeData().hasFormat(TASK_MIME_TYPE):
             e.acceptProposedAction()
 
     def dropEvent(self, e):
-        if isinstance(e.source(), TaskCard):
-            task_id = int(e.mimeData().text())
-            self.card_dropped.emit(task_id, self.column_id)
+        task_ids = task_ids_from_mime(e.mimeData())
+        if task_ids:
+            # Soltar sobre o título da coluna coloca os cards no topo
+            self.on_tasks_dropped(task_ids, 0)
             e.acceptProposedAction()
 
+class BoardView(QWidget):
+    # Um quadro renderizado: uma KanbanColumn por coluna, na ordem do quadro,
+    # e o TaskStore com as tarefas carregadas dele (as primeiras páginas de
+    # cada coluna e o que veio depois pela rolagem).
+    def __init__(self, board, columns, parent=None):
+        super().__init__(parent)
+        self.board_id = board['id']
+        self.nome = board['nome']
+        self.column_rows = columns
+        self.store = TaskStore()
+        self.columns = {}
+        
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        for row in columns:
+            column = KanbanColumn(row['nome'], row['id'], self.store, row['conclui'])
+            self.columns[row['id']] = column
+            layout.addWidget(column)
+
+    def display_tasks(self, tasks):
+        with metrics.span("board.group_rows"):
+            self.store.load(task for task in tasks if task.coluna in self.columns)
+        
+        with metrics.span("board.model_reset"):
+            for column in self.columns.values():
+                # Cada coluna chega só com a primeira página; o resto vem pela rolagem
+                column.model.set_paging(self.store.column(column.column_id))
+                column.reload()
+
+    def is_filtered(self):
+        return any(column.model.is_filtered for column in self.columns.values())
+
+    def apply_search(self, task_ids):
+        for column in self.columns.values():
+            column.model.set_filter(task_ids)
+
+    def snapshot(self, rows_per_column):
+        tasks = []
+        for column in self.columns.values():
+            tasks.extend(column.model.leading_tasks(rows_per_column))
+        return {'id': self.board_id, 'nome': self.nome}, self.column_rows, tasks
+
+    def rename_column(self, column_id, nome):
+        self.columns[column_id].title_label.setText(nome)
+        for row in self.column_rows:
+            if row['id'] == column_id:
+                row['nome'] = nome
+
+    def update_cards(self, task_ids, new_tasks):
+        # Lote: cada coluna afetada recebe um único reset (uma repintura), em
+        # vez de um sinal de inserção/remoção por card
+        old_tasks = [task for task in map(self.store.get, task_ids) if task is not None]
+        new_tasks = [task for task in new_tasks if task.coluna in self.columns]
+        column_ids = {task.coluna for task in old_tasks} | {task.coluna for task in new_tasks}
+        models = [self.columns[column_id].model for column_id in column_ids]
+        
+        for model in models:
+            model.begin_batch()
+        for task in old_tasks:
+            self.store.discard(task.id)
+        for task in new_tasks:
+            self.store.add(task)
+        for model in models:
+            model.end_batch()
+
+class DatabaseWorker(QThread):
+    # Executa as chamadas ao Database numa thread dedicada, em ordem de
+    # chegada, e devolve o resultado na thread da interface via sinal.
+    request_finished = pyqtSignal(int, object, object)
+
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self._queue = queue.Queue()
+        self._callbacks = {}
+        self._next_request_id = 0
+        self.request_finished.connect(self.on_request_finished)
+
+    def submit(self, func, *args, on_result=None, on_error=None):
+        self._next_request_id += 1
+        request_id = self._next_request_id
+        self._callbacks[request_id] = (on_result, on_error)
+        self._queue.put((request_id, func, args, time.perf_counter()))
+        return request_id
+
+    def pending_count(self):
+        return len(self._callbacks)
+
+    def has_pending_after(self, request_id):
+        return any(pending_id > request_id for pending_id in self._callbacks)
+
+    def stop(self):
+        self._queue.put(None)
+        self.wait()
+
+    def run(self):
+        while True:
+            request = self._queue.get()
+            if request is None:
+                break
+            
+            request_id, func, args, submitted_at = request
+            metrics.observe("db.queue_wait", (time.perf_counter() - submitted_at) * 1000)
+            try:
+                with metrics.span("db." + func.__name__):
+                    result = func(*args)
+                self.request_finished.emit(request_id, result, None)
+            except Exception as e:
+                metrics.incr("db.errors")
+                self.request_finished.emit(request_id, None, e)
+
+    def on_request_finished(self, request_id, result, error):
+        on_result, on_error = self._callbacks.pop(request_id, (None, None))
+        if error is None:
+            if on_result is not None:
+                on_result(result)
+        elif on_error is not None:
+            on_error(error)
+        else:
+            print(f"Erro na thread do banco de dados: {error}")
+
+def summarize_titles(titulos):
+    shown = ", ".join(f"'{titulo}'" for titulo in titulos[:NOTIFICATION_SUMMARY_TITLES])
+    hidden = len(titulos) - NOTIFICATION_SUMMARY_TITLES
+    return f"{shown} e mais {hidden}" if hidden > 0 else shown
+
+
+class NotificationDispatcher(QThread):
+    # Uma única thread mostra as notificações, uma de cada vez e com um
+    # intervalo mínimo entre elas. A fila é limitada: cheia, descarta as novas.
+    # Sem backend de toast, a bandeja (na thread da interface) recebe as
+    # mensagens pelo mesmo caminho.
+    fallback_requested = pyqtSignal(str, str)
+
+    def __init__(self, load_toaster, parent=None):
+        super().__init__(parent)
+        self.load_toaster = load_toaster
+        self._queue = queue.Queue(maxsize=NOTIFICATION_QUEUE_SIZE)
+        self._stopping = threading.Event()
+
+    def submit(self, title, message):
+        try:
+            self._queue.put_nowait((title, message))
+        except queue.Full:
+            metrics.incr("notifications.dropped")
+            print(f"Fila de notificações cheia; descartada: {title}")
+
+    def stop(self):
+        self._stopping.set()
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass
+        self.wait()
+
+    def run(self):
+        while not self._stopping.is_set():
+            item = self._queue.get()
+            if item is None:
+                break
+            
+            title, message = item
+            toaster = self.load_toaster()
+            if toaster is None:
+                self.fallback_requested.emit(title, message)
+            else:
+                try:
+                    toaster.show_toast(title, message, duration=NOTIFICATION_DURATION_S, threaded=True)
+                    # Espera o toast sumir antes do próximo, sem travar o stop()
+                    while toaster.notification_active() and not self._stopping.wait(0.2):
+                        pass
+                except Exception as e:
+                    print(f"Erro ao mostrar notificação: {e}")
+            metrics.incr("notifications.shown")
+            self._stopping.wait(NOTIFICATION_MIN_INTERVAL_S)
+
+class DeadlineScheduler(QObject):
+    # Min-heap com o próximo limiar (10d, 5d, 1d, agora) de cada tarefa e um
+    # único QTimer armado para o mais próximo. Entradas de tarefas editadas ou
+    # excluídas são invalidadas pela versão e descartadas ao chegar no topo.
+    due = pyqtSignal()
+    
+    # Limite de espera para tolerar suspensão da máquina e ajustes de relógio
+    MAX_SLEEP_MS = 60 * 60 * 1000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._heap = []
+        self._versions = {}
+        self._next_version = 0
+        
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.timeout.connect(self.on_timeout)
+
+    def load(self, rows):
+        # Linhas de Database.list_pending_deadlines
+        self._heap.clear()
+        self._versions.clear()
+        for row in rows:
+            self._heap.extend(self._task_events(row['id'], row['notificar_em'], row))
+        heapq.heapify(self._heap)
+        self._arm()
+
+    def schedule_task(self, task):
+        self._versions.pop(task.id, None)
+        flags = {flag: getattr(task, flag) for flag in NOTIFICATION_COLUMNS}
+        # Tarefas concluídas não geram avisos
+        deadline = task.notificar_em if task.concluida_em is None else None
+        for entry in self._task_events(task.id, deadline, flags):
+            heapq.heappush(self._heap, entry)
+        self._arm()
+
+    def unschedule_task(self, task_id):
+        self._versions.pop(task_id, None)
+        self._arm()
+
+    def _task_events(self, task_id, deadline, flags):
+        if deadline is None:
+            return []
+        
+        self._next_version += 1
+        version = self._next_version
+        self._versions[task_id] = version
+        
+        # Tudo em segundos desde a época, como o banco guarda o prazo
+        now = time.time()
+        events = []
+        for flag, start, end in NOTIFICATION_TIERS:
+            if flags[flag]:
+                continue
+            if end is not None and deadline - end <= now:
+                continue
+            events.append((max(deadline - start, now), task_id, version))
+        return events
+
+    def _is_stale(self, entry):
+        return self._versions.get(entry[1]) != entry[2]
+
+    def _arm(self):
+        while self._heap and self._is_stale(self._heap[0]):
+            heapq.heappop(self._heap)
+        if not self._heap:
+            self._timer.stop()
+            return
+        
+        delay = (self._heap[0][0] - time.time()) * 1000
+        self._timer.start(int(min(max(delay, 0), self.MAX_SLEEP_MS)))
+
+    def on_timeout(self):
+        metrics.incr("scheduler.wakeups")
+        now = time.time()
+        fired = False
+        while self._heap and self._heap[0][0] <= now:
+            entry = heapq.heappop(self._heap)
+            if not self._is_stale(entry):
+                fired = True
+        
+        if fired:
+            self.due.emit()
+        self._arm()
+
+def lead_time_summary(lead_times):
+    # (tarefas, média, mediana) em dias, a partir do histograma (dias, total)
+    count = sum(total for _, total in lead_times)
+    if not count:
+        return 0, None, None
+    mean = sum(dias * total for dias, total in lead_times) / count
+    seen = 0
+    for dias, total in lead_times:
+        seen += total
+        if seen * 2 >= count:
+            return count, mean, dias
+
+def lead_time_bins(lead_times):
+    totals = [0] * len(LEAD_TIME_BINS)
+    for dias, total in lead_times:
+        index = max(i for i, (lower, _) in enumerate(LEAD_TIME_BINS) if dias >= lower)
+        totals[index] += total
+    return [(label, total) for (_, label), total in zip(LEAD_TIME_BINS, totals)]
+
+def week_label(semana):
+    # As semanas dos resumos começam na segunda, em UTC
+    return datetime.fromtimestamp(semana, timezone.utc).strftime("%d/%m")
+
+class StatsDialog(QDialog):
+    # Painel de estatísticas do quadro ativo. Os números vêm prontos das
+    # tabelas de resumo do banco (Database.board_stats); aqui só se desenha.
+    refresh_requested = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Estatísticas")
+        self.setMinimumWidth(420)
+        layout = QVBoxLayout(self)
+        
+        self.content = QLabel(self)
+        self.content.setTextFormat(Qt.TextFormat.RichText)
+        layout.addWidget(self.content)
+        
+        button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
+        refresh_button = button_box.addButton("Atualizar", QDialogButtonBox.ButtonRole.ActionRole)
+        refresh_button.clicked.connect(self.refresh_requested)
+        button_box.rejected.connect(self.close)
+        layout.addWidget(button_box)
+
+    def show_stats(self, nome, stats):
+        sections = [f"<h3>{html.escape(nome)}</h3>"]
+        sections.append(self.table("Tarefas por coluna", [
+            (column['nome'], column['total']) for column in stats['colunas']
+        ]))
+        sections.append(f"<p><b>Atrasadas:</b> {stats['atrasadas']}</p>")
+        
+        upcoming = dict(tuple(row) for row in stats['prazos'])
+        sections.append(self.table("Prazos por semana", [
+            (week_label(semana), upcoming.get(semana, 0))
+            for semana in range(stats['semana'], stats['semana'] + STATS_WEEKS * STATS_WEEK_SECONDS, STATS_WEEK_SECONDS)
+        ]))
+        completed = dict(tuple(row) for row in stats['conclusoes'])
+        sections.append(self.table("Concluídas por semana", [
+            (week_label(semana), completed.get(semana, 0))
+            for semana in range(stats['semana'] - (STATS_WEEKS - 1) * STATS_WEEK_SECONDS,
+                                stats['semana'] + 1, STATS_WEEK_SECONDS)
+        ]))
+        
+        lead_times = [tuple(row) for row in stats['lead_times']]
+        count, mean, median = lead_time_summary(lead_times)
+        if count:
+            sections.append(
+                f"<p><b>Lead time</b> (criação até a conclusão)<br>"
+                f"{count} tarefa(s): média de {mean:.1f} dia(s), mediana de {median} dia(s)</p>"
+            )
+            sections.append(self.table(None, lead_time_bins(lead_times)))
+        else:
+            sections.append("<p><b>Lead time:</b> nenhuma tarefa concluída.</p>")
+        self.content.setText("".join(sections))
+        self.adjustSize()
+
+    def table(self, title, rows):
+        peak = max([total for _, total in rows] + [1])
+        lines = [f"<p><b>{title}</b></p>"] if title else []
+        lines.append("<table cellspacing='2'>")
+        for label, total in rows:
+            bar = "█" * round(STATS_BAR_WIDTH * total / peak)
+            lines.append(
+                f"<tr><td>{html.escape(str(label))}</td><td align='right'>&nbsp;{total}&nbsp;</td>"
+                f"<td style='color:#0078D7'>{bar}</td></tr>"
+            )
+        lines.append("</table>")
+        return "".join(lines)
+
+class MetricsOverlay(QLabel):
+    # Painel de depuração sobreposto à janela (Ctrl+Shift+D) com os spans
+    # mais caros e os contadores coletados por kanban_metrics.
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.setObjectName("MetricsOverlay")
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.setTextFormat(Qt.TextFormat.PlainText)
+        self.setAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignLeft)
+        font = QFont("Consolas")
+        font.setStyleHint(QFont.StyleHint.Monospace)
+        font.setPixelSize(11)
+        self.setFont(font)
+        self.hide()
+        
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+    def toggle(self):
+        if self.isVisible():
+            self.refresh_timer.stop()
+            self.hide()
+            return
+        if not metrics.enabled:
+            metrics.enable()
+        self.refresh()
+        self.show()
+        self.raise_()
+        self.refresh_timer.start(METRICS_OVERLAY_REFRESH_MS)
+
+    def refresh(self):
+        snapshot = metrics.snapshot()
+        histograms = sorted(
+            snapshot['histograms'].items(),
+            key=lambda item: item[1]['avg_ms'] * item[1]['count'],
+            reverse=True
+        )
+        lines = [f"{'span':<28}{'n':>7}{'avg':>9}{'p95':>9}{'max':>9}"]
+        for name, data in histograms[:METRICS_OVERLAY_ROWS]:
+            lines.append(
+                f"{name[:27]:<28}{data['count']:>7}{data['avg_ms']:>9.2f}"
+                f"{data['p95_ms']:>9.2f}{data['max_ms']:>9.2f}"
+            )
+        if snapshot['counters']:
+            lines.append("")
+            for name, value in sorted(snapshot['counters'].items()):
+                lines.append(f"{name[:27]:<28}{value:>7}")
+        self.setText("\n".join(lines))
+        self.adjustSize()
+        parent = self.parentWidget()
+        self.move(parent.width() - self.width() - 10, 10)
+
 class MainWindow(QMainWindow):
-    def __init__(self, db_connection_func):
+    task_saved = pyqtSignal(object)
+    task_deleted = pyqtSignal(int)
+    tasks_imported = pyqtSignal(int)
+    first_painted = pyqtSignal()
+
+    def __init__(self, db_worker, snapshot=None):
         super().__init__()
-        self.db_connection_func = db_connection_func
+        self.db_worker = db_worker
+        self.first_paint_ms = None
+        # Enquanto só o retrato está na tela, mover/editar/excluir é ignorado
+        self.board_loaded = False
         
         self.setWindowTitle(APP_TITLE)
         self.setGeometry(100, 100, 1000, 700)
@@ -363,104 +1386,570 @@ class MainWindow(QMainWindow):
         main_widget = QWidget()
         main_layout = QVBoxLayout(main_widget)
         
+        top_layout = QHBoxLayout()
+        self.board_selector = QComboBox()
+        self.board_selector.setObjectName("BoardSelector")
+        self.board_selector.setMinimumWidth(200)
+        self.board_selector.activated.connect(
+            lambda index: self.switch_board(self.board_selector.itemData(index))
+        )
+        top_layout.addWidget(self.board_selector)
+        
         self.add_task_button = QPushButton("➕ Nova Tarefa")
         self.add_task_button.setObjectName("AddTaskButton")
         self.add_task_button.setCursor(Qt.CursorShape.PointingHandCursor)
-        self.add_task_button.clicked.connect(self.open_new_task_dialog)
-        main_layout.addWidget(self.add_task_button)
+        self.add_task_button.clicked.connect(lambda: self.open_new_task_dialog())
+        top_layout.addWidget(self.add_task_button, 1)
+        main_layout.addLayout(top_layout)
+
+        self.search_edit = QLineEdit()
+        self.search_edit.setObjectName("SearchEdit")
+        self.search_edit.setPlaceholderText("🔍 Buscar tarefas por título ou descrição...")
+        self.search_edit.setClearButtonEnabled(True)
+        main_layout.addWidget(self.search_edit)
         
-        columns_widget = QWidget()
-        columns_layout = QHBoxLayout(columns_widget)
+        self.search_generation = 0
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.run_search)
+        self.search_edit.textChanged.connect(self.search_timer.start)
         
-        self.coluna_todo = KanbanColumn("A Fazer", "todo")
-        self.coluna_doing = KanbanColumn("Fazendo", "doing")
-        self.coluna_done = KanbanColumn("Feito", "done")
+        # Mudanças de outras instâncias ou scripts: a cada ciclo a thread do
+        # banco compara PRAGMA data_version e só lê o log de mudanças se outra
+        # conexão gravou algo
+        self.change_sequence = None
+        self.data_version = None
+        self.sync_in_flight = False
+        self.sync_timer = QTimer(self)
+        self.sync_timer.setInterval(SYNC_HIDDEN_POLL_MS)
+        self.sync_timer.timeout.connect(self.sync_changes)
         
-        self.coluna_todo.card_dropped.connect(self.on_card_moved)
-        self.coluna_doing.card_dropped.connect(self.on_card_moved)
-        self.coluna_done.card_dropped.connect(self.on_card_moved)
+        # Quadros renderizados por id, do usado há mais tempo ao atual (LRU);
+        # só o quadro ativo fica visível na pilha
+        self.boards = OrderedDict()
+        self.board = None
+        self.stats_dialog = None
+        self.board_stack = QStackedWidget()
+        main_layout.addWidget(self.board_stack)
+        self.setCentralWidget(main_widget)
+
+        file_menu = self.menuBar().addMenu("Arquivo")
+        import_action = QAction("Importar tarefas...", self)
+        import_action.triggered.connect(self.import_tasks_from_file)
+        file_menu.addAction(import_action)
         
-        columns_layout.addWidget(self.coluna_todo)
-        columns_layout.addWidget(self.coluna_doing)
-        columns_layout.addWidget(self.coluna_done)
+        export_action = QAction("Exportar tarefas...", self)
+        export_action.triggered.connect(self.export_tasks_to_file)
+        file_menu.addAction(export_action)
+        file_menu.addSeparator()
         
-        main_layout.addWidget(columns_widget)
-        self.setCentralWidget(main_widget)
+        refresh_action = QAction("Atualizar", self)
+        refresh_action.setShortcut(QKeySequence(QKeySequence.StandardKey.Refresh))
+        refresh_action.triggered.connect(self.load_and_display_tasks)
+        file_menu.addAction(refresh_action)
         
-        self.load_and_display_tasks()
+        edit_menu = self.menuBar().addMenu("Editar")
+        undo_action = QAction("Desfazer", self)
+        undo_action.setShortcut(QKeySequence(QKeySequence.StandardKey.Undo))
+        undo_action.triggered.connect(lambda: self.replay_operation(redo=False))
+        edit_menu.addAction(undo_action)
+        
+        redo_action = QAction("Refazer", self)
+        redo_action.setShortcuts([QKeySequence("Ctrl+Shift+Z"), QKeySequence("Ctrl+Y")])
+        redo_action.triggered.connect(lambda: self.replay_operation(redo=True))
+        edit_menu.addAction(redo_action)
+        
+        board_menu = self.menuBar().addMenu("Quadro")
+        for label, handler in (
+            ("Novo quadro...", self.create_board),
+            ("Renomear quadro...", self.rename_board),
+            ("Nova coluna...", self.create_column),
+            ("Estatísticas...", self.show_stats),
+        ):
+            action = QAction(label, self)
+            action.triggered.connect(handler)
+            board_menu.addAction(action)
+
+        search_action = QAction("Buscar", self)
+        search_action.setShortcut(QKeySequence(QKeySequence.StandardKey.Find))
+        search_action.triggered.connect(self.search_edit.setFocus)
+        self.addAction(search_action)
+        
+        self.metrics_overlay = MetricsOverlay(self)
+        overlay_action = QAction("Painel de desempenho", self)
+        overlay_action.setShortcut(QKeySequence("Ctrl+Shift+D"))
+        overlay_action.triggered.connect(self.metrics_overlay.toggle)
+        self.addAction(overlay_action)
+        
+        # O retrato é do último quadro aberto, que volta a ser o ativo
+        board_id = None
+        if snapshot:
+            board, columns, tasks = snapshot
+            view = self.board_view(board, columns)
+            self.display_tasks(view, tasks)
+            self.show_board(view)
+            board_id = view.board_id
+        self.load_boards()
+        self.load_board(board_id, reset_cache=True)
+
+    def event(self, event):
+        if event.type() == QEvent.Type.Paint and self.first_paint_ms is None:
+            self.first_paint_ms = (time.perf_counter() - STARTED_AT) * 1000
+            metrics.observe("startup.first_paint", self.first_paint_ms)
+            # Emitido depois que a pintura termina
+            QTimer.singleShot(0, self.first_painted.emit)
+        return super().event(event)
 
     def load_and_display_tasks(self):
-        self.coluna_todo.clear_cards()
-        self.coluna_doing.clear_cards()
-        self.coluna_done.clear_cards()
+        # Reconstrução completa do quadro ativo; usada no "Atualizar" (F5),
+        # depois de importar e como fallback. Os outros quadros em cache
+        # podem ter ficado para trás e são descartados.
+        self.load_board(self.board.board_id if self.board is not None else None, reset_cache=True)
+    
+    def load_board(self, board_id, reset_cache=False):
+        requested_at = time.perf_counter()
+        
+        def loaded(result):
+            sequence, board, columns, tasks = result
+            if reset_cache:
+                for view in list(self.boards.values()):
+                    if view.board_id != board['id']:
+                        self.drop_board(view)
+                self.change_sequence = sequence
+            elif self.change_sequence is not None:
+                # Um log só para todos os quadros: segue da menor sequência
+                # (reler mudanças já aplicadas não altera nada)
+                self.change_sequence = min(self.change_sequence, sequence)
+            else:
+                self.change_sequence = sequence
+            # Relê o log uma vez: pega o que mudou entre a carga e o próximo ciclo
+            self.data_version = None
+            self.sync_timer.start()
+            view = self.board_view(board, columns)
+            self.display_tasks(view, tasks)
+            self.show_board(view)
+            metrics.observe("board.load_total", (time.perf_counter() - requested_at) * 1000)
+            if not self.board_loaded:
+                self.board_loaded = True
+                metrics.observe("startup.board_loaded", (time.perf_counter() - STARTED_AT) * 1000)
+        
+        self.db_worker.submit(
+            load_board, self.db_worker.db, board_id,
+            on_result=loaded,
+            on_error=lambda e: print(f"Erro ao buscar tarefas: {e}")
+        )
+    
+    def load_boards(self):
+        def loaded(boards):
+            self.board_selector.clear()
+            for board in boards:
+                self.board_selector.addItem(board['nome'], board['id'])
+            self.select_current_board()
+        
+        self.db_worker.submit(
+            self.db_worker.db.list_boards,
+            on_result=loaded,
+            on_error=lambda e: print(f"Erro ao buscar quadros: {e}")
+        )
+    
+    def select_current_board(self):
+        if self.board is not None:
+            index = self.board_selector.findData(self.board.board_id)
+            if index >= 0:
+                self.board_selector.setCurrentIndex(index)
+    
+    def board_view(self, board, columns):
+        # Reaproveita o quadro em cache se as colunas não mudaram
+        view = self.boards.get(board['id'])
+        if view is not None and view.column_rows == columns:
+            view.nome = board['nome']
+            return view
+        if view is not None:
+            self.drop_board(view)
+        
+        view = BoardView(board, columns)
+        for column in view.columns.values():
+            column.cards_dropped.connect(self.on_cards_moved)
+            column.delete_selected_requested.connect(self.on_delete_tasks)
+            column.selection_menu_requested.connect(self.show_selection_menu)
+            column.column_menu_requested.connect(self.show_column_menu)
+            column.edit_requested.connect(self.on_edit_task)
+            column.delete_requested.connect(self.on_delete_task)
+            column.model.page_requested.connect(self.load_next_page)
+        self.board_stack.addWidget(view)
+        self.boards[view.board_id] = view
+        return view
+    
+    def show_board(self, view):
+        self.boards.move_to_end(view.board_id)
+        self.board = view
+        self.board_stack.setCurrentWidget(view)
+        self.select_current_board()
+        while len(self.boards) > BOARD_CACHE_SIZE:
+            self.drop_board(next(iter(self.boards.values())))
+        # A busca vale para o quadro ativo: é refeita (ou desfeita) na troca
+        if self.search_edit.text().strip() or view.is_filtered():
+            self.run_search()
+        if self.stats_dialog is not None and self.stats_dialog.isVisible():
+            self.load_stats()
+    
+    def drop_board(self, view):
+        # Fora do cache o quadro não ocupa memória: widgets, modelos e tarefas vão embora
+        del self.boards[view.board_id]
+        self.board_stack.removeWidget(view)
+        view.deleteLater()
+        if view is self.board:
+            self.board = None
+    
+    def switch_board(self, board_id):
+        if board_id is None or (self.board is not None and board_id == self.board.board_id):
+            return
+        view = self.boards.get(board_id)
+        if view is not None:
+            # Em cache e em dia (o log de mudanças é aplicado a todos os quadros em cache)
+            metrics.incr("board.cache_hits")
+            self.show_board(view)
+            return
+        metrics.incr("board.cache_misses")
+        self.load_board(board_id)
+    
+    def find_column(self, column_id):
+        for view in self.boards.values():
+            column = view.columns.get(column_id)
+            if column is not None:
+                return column
+        return None
+    
+    def load_next_page(self, column_id, after):
+        model = self.find_column(column_id).model
+
+        def loaded(page):
+            # Um recarregamento completo no meio do caminho invalida a página
+            if model.page_pending and model.page_cursor == after:
+                model.append_page(page)
+                metrics.incr("board.pages_loaded")
+        
+        def failed(e):
+            model.page_pending = False
+            print(f"Erro ao carregar tarefas: {e}")
+        
+        self.db_worker.submit(load_page, self.db_worker.db, column_id, after, on_result=loaded, on_error=failed)
+
+    def sync_changes(self):
+        if self.sync_in_flight or self.change_sequence is None:
+            return
+        self.sync_in_flight = True
+        metrics.incr("sync.polls")
+        sequence = self.change_sequence
+        
+        def polled(result):
+            self.sync_in_flight = False
+            version, changes = result
+            # Um recarregamento completo no meio do caminho já trouxe tudo
+            if sequence != self.change_sequence:
+                return
+            if changes is None:
+                self.data_version = version
+                return
+            # Gravações desta janela enviadas depois da leitura não estão no
+            # que foi lido; a leitura é refeita no próximo ciclo
+            if self.db_worker.has_pending_after(request_id):
+                return
+            self.data_version = version
+            self.change_sequence, tasks, deleted_ids = changes
+            if tasks is None:
+                self.load_and_display_tasks()
+            else:
+                self.apply_changes(tasks, deleted_ids)
         
-        tasks = self.load_tasks_from_db()
+        def failed(e):
+            self.sync_in_flight = False
+            print(f"Erro ao sincronizar tarefas: {e}")
         
+        request_id = self.db_worker.submit(
+            poll_changes, self.db_worker.db, self.data_version, sequence,
+            on_result=polled,
+            on_error=failed
+        )
+
+    def apply_changes(self, tasks, deleted_ids):
+        # O log também traz as gravações desta janela, já aplicadas no quadro
+        changed = [task for task in tasks if not self.is_current(task)]
+        deleted_ids = [task_id for task_id in deleted_ids if self.find_task(task_id) is not None]
+        if not changed and not deleted_ids:
+            return
+        metrics.incr("sync.changes", len(changed) + len(deleted_ids))
+        
+        visible = self.visible_tasks(changed)
+        removed_ids = [task.id for task in changed] + deleted_ids
+        if len(removed_ids) <= SYNC_INCREMENTAL_LIMIT:
+            for task_id in removed_ids:
+                self.remove_task_card(task_id)
+            for task in visible:
+                self.show_task_card(task)
+        else:
+            self.update_cards(removed_ids, visible)
+        
+        for task in changed:
+            self.task_saved.emit(task)
+        for task_id in deleted_ids:
+            self.task_deleted.emit(task_id)
+        self.refresh_search()
+
+    def visible_tasks(self, tasks):
+        # Só as tarefas de quadros em cache, e dentro das páginas já carregadas
+        visible = []
         for task in tasks:
-            task_dict = dict(task) 
-            card = TaskCard(task_dict)
-            card.edit_requested.connect(self.on_edit_task)
-            card.delete_requested.connect(self.on_delete_task)
-            
-            if task_dict['coluna'] == 'todo':
-                self.coluna_todo.add_card(card)
-            elif task_dict['coluna'] == 'doing':
-                self.coluna_doing.add_card(card)
-            elif task_dict['coluna'] == 'done':
-                self.coluna_done.add_card(card)
-
-    def on_card_moved(self, task_id, new_column_id):
-        conn = self.db_connection_func()
-        if conn is None:
-            QMessageBox.warning(self, "Erro de DB", "Não foi possível conectar ao DB para mover a tarefa.")
-            self.load_and_display_tasks()
+            column = self.find_column(task.coluna)
+            if column is not None and not column.model.is_unloaded(task):
+                visible.append(task)
+        return visible
+
+    def is_current(self, task):
+        current = self.find_task(task.id)
+        return current is not None and current.to_dict() == task.to_dict()
+
+    def display_tasks(self, view, tasks):
+        view.display_tasks(tasks)
+        metrics.incr("board.full_reloads")
+        
+        if view is self.board and self.search_edit.text().strip():
+            self.run_search()
+    
+    def run_search(self):
+        self.search_timer.stop()
+        self.search_generation += 1
+        generation = self.search_generation
+        if self.board is None:
+            return
+        
+        text = self.search_edit.text().strip()
+        if not text:
+            self.apply_search(None)
             return
+        
+        def found(task_ids):
+            # Descarta respostas de buscas que já foram substituídas pela
+            # digitação ou pela troca de quadro
+            if generation != self.search_generation:
+                return
+            # Resultados em páginas ainda não carregadas são buscados antes
+            missing = [task_id for task_id in task_ids if self.find_task(task_id) is None]
+            if not missing:
+                self.apply_search(task_ids)
+                return
             
-        cursor = conn.cursor()
-        try:
-            query = "UPDATE tasks SET coluna = ? WHERE id = ?"
-            cursor.execute(query, (new_column_id, task_id))
-            conn.commit()
-            self.load_and_display_tasks() 
-                
-        except sqlite3.Error as e:
-            QMessageBox.warning(self, "Erro de DB", f"Erro ao atualizar coluna: {e}")
-            self.load_and_display_tasks()
-        finally:
-            conn.close()
-
-    def load_tasks_from_db(self, task_id=None):
-        conn = self.db_connection_func()
-        if conn is None:
-            return [] if task_id is None else None
+            def loaded(tasks):
+                if generation == self.search_generation:
+                    self.update_cards([], [task for task in tasks if self.find_task(task.id) is None])
+                    self.apply_search(task_ids)
             
-        conn.row_factory = sqlite3.Row 
-        cursor = conn.cursor() 
+            self.db_worker.submit(
+                load_tasks_by_id, self.db_worker.db, missing,
+                on_result=loaded,
+                on_error=lambda e: print(f"Erro ao buscar tarefas: {e}")
+            )
         
-        if task_id:
-            query = "SELECT * FROM tasks WHERE id = ?"
-            try:
-                cursor.execute(query, (task_id,))
-                task = cursor.fetchone()
+        self.db_worker.submit(
+            self.db_worker.db.search_tasks, text, self.board.board_id,
+            on_result=found,
+            on_error=lambda e: print(f"Erro ao buscar tarefas: {e}")
+        )
+
+    def apply_search(self, task_ids):
+        self.board.apply_search(task_ids)
+    
+    def refresh_search(self):
+        # Após criar ou editar uma tarefa, refaz a busca ativa para incluí-la
+        if self.search_edit.text().strip():
+            self.search_timer.start()
+
+    def snapshot_board(self):
+        return self.board.snapshot(SNAPSHOT_ROWS_PER_COLUMN)
+    
+    # As tarefas são procuradas e atualizadas em todos os quadros em cache:
+    # cada uma está no quadro da sua coluna, se ele estiver carregado
+    def find_task(self, task_id):
+        for view in self.boards.values():
+            task = view.store.get(task_id)
+            if task is not None:
                 return task
-            except sqlite3.Error as e:
-                print(f"Erro ao buscar tarefa {task_id}: {e}")
-                return None
-            finally:
-                conn.close()
+        return None
+    
+    def show_task_card(self, task):
+        metrics.incr("board.card_updates")
+        self.remove_task_card(task.id)
+        column = self.find_column(task.coluna)
+        if column is not None:
+            column.model.insert_task(task)
+    
+    def remove_task_card(self, task_id):
+        for view in self.boards.values():
+            task = view.store.get(task_id)
+            if task is not None:
+                view.columns[task.coluna].model.remove_task(task_id)
+    
+    def update_cards(self, task_ids, new_tasks):
+        metrics.incr("board.batch_updates")
+        for view in self.boards.values():
+            view.update_cards(task_ids, new_tasks)
+
+    def remove_archived_tasks(self, task_ids):
+        self.update_cards(task_ids, [])
+        for task_id in task_ids:
+            self.task_deleted.emit(task_id)
+
+    def drop_neighbours(self, column_id, row, moving_ids):
+        # Cards visíveis imediatamente acima e abaixo da linha de destino,
+        # ignorando os que estão sendo movidos
+        model = self.find_column(column_id).model
+        before = after = None
+        for above in range(min(row, model.rowCount()) - 1, -1, -1):
+            if model.task_at(above).id not in moving_ids:
+                before = model.task_at(above)
+                break
+        for below in range(row, model.rowCount()):
+            if model.task_at(below).id not in moving_ids:
+                after = model.task_at(below)
+                break
+        return before, after
+
+    def ranks_for_drop(self, before, after, count):
+        lower = before.rank if before is not None else None
+        upper = after.rank if after is not None else None
+        if lower is not None and upper is not None and lower >= upper:
+            # Ranks repetidos (ex.: escrita concorrente): cai para depois de lower
+            upper = None
+        return ranks_between(lower, upper, count)
+
+    def on_cards_moved(self, task_ids, new_column_id, row=0):
+        if len(task_ids) == 1:
+            self.on_card_moved(task_ids[0], new_column_id, row)
+            return
+        if not self.board_loaded or new_column_id not in self.board.columns:
+            return
+        
+        old_tasks = [task for task in map(self.find_task, task_ids) if task is not None]
+        if not old_tasks:
+            return
+        moved_ids = [task.id for task in old_tasks]
+        before, after = self.drop_neighbours(new_column_id, row, set(moved_ids))
+        ranks = self.ranks_for_drop(before, after, len(old_tasks))
+        new_tasks = [self.moved_task(task, new_column_id, rank) for task, rank in zip(old_tasks, ranks)]
+        self.update_cards(moved_ids, new_tasks)
+        
+        def moved(_):
+            for task in new_tasks:
+                self.task_saved.emit(task)
+        
+        def rollback(e):
+            self.update_cards(moved_ids, old_tasks)
+            QMessageBox.warning(self, "Erro de DB", f"Erro ao mover tarefas: {e}")
+        
+        self.db_worker.submit(
+            self.db_worker.db.move_tasks, moved_ids, new_column_id, ranks,
+            on_result=moved,
+            on_error=rollback
+        )
+
+    def moved_task(self, task, column_id, rank):
+        # Mesma regra de MOVE_TASK_SQL: entrar numa coluna de conclusão marca
+        # a conclusão (ou mantém a que havia) e sair dela a desfaz
+        if not self.board.columns[column_id].conclui:
+            concluida_em = None
         else:
-            tasks = []
-            try:
-                cursor.execute("SELECT * FROM tasks ORDER BY data_criacao DESC")
-                tasks = cursor.fetchall()
-            except sqlite3.Error as e:
-                print(f"Erro ao buscar tarefas: {e}")
-            finally:
-                conn.close()
-            return tasks
-
-    def open_new_task_dialog(self):
+            concluida_em = task.concluida_em or int(time.time())
+        return task.replace(coluna=column_id, rank=rank, concluida_em=concluida_em)
+
+    def show_selection_menu(self, task_ids, global_pos):
+        if not self.board_loaded or not task_ids:
+            return
+        
+        menu = QMenu(self)
+        move_menu = menu.addMenu(f"Mover {len(task_ids)} tarefa(s) para")
+        for column_id, column in self.board.columns.items():
+            action = move_menu.addAction(column.title_label.text())
+            action.triggered.connect(lambda _, column_id=column_id: self.on_cards_moved(task_ids, column_id))
+        
+        shift_menu = menu.addMenu("Adiar prazo")
+        for label, delta in DEADLINE_SHIFTS:
+            action = shift_menu.addAction(label)
+            action.triggered.connect(lambda _, delta=delta: self.db_shift_deadlines(task_ids, delta))
+        
+        menu.addSeparator()
+        delete_action = menu.addAction(f"Excluir {len(task_ids)} tarefa(s)")
+        delete_action.triggered.connect(lambda: self.on_delete_tasks(task_ids))
+        menu.exec(global_pos)
+
+    def db_shift_deadlines(self, task_ids, delta):
+        old_tasks = [task for task in map(self.find_task, task_ids)
+                     if task is not None and task.notificar_em is not None]
+        if not old_tasks:
+            return
+        shifted_ids = [task.id for task in old_tasks]
+        # Mesma conta que o banco faz: o prazo é um inteiro em segundos
+        seconds = int(delta.total_seconds())
+        new_tasks = [
+            task.replace(
+                notificar_em=task.notificar_em + seconds,
+                notificado=0, notificado_10d=0, notificado_5d=0, notificado_1d=0
+            )
+            for task in old_tasks
+        ]
+        self.update_cards(shifted_ids, new_tasks)
+        
+        def shifted(_):
+            for task in new_tasks:
+                self.task_saved.emit(task)
+        
+        def rollback(e):
+            self.update_cards(shifted_ids, old_tasks)
+            QMessageBox.warning(self, "Erro de DB", f"Erro ao adiar prazos: {e}")
+        
+        self.db_worker.submit(
+            self.db_worker.db.shift_deadlines, shifted_ids, delta,
+            on_result=shifted,
+            on_error=rollback
+        )
+
+    def on_card_moved(self, task_id, new_column_id, row=0):
+        task = self.find_task(task_id)
+        if not self.board_loaded or task is None or new_column_id not in self.board.columns:
+            return
+        
+        before, after = self.drop_neighbours(new_column_id, row, {task_id})
+        if (task.coluna == new_column_id
+                and (before is None or before.sort_key < task.sort_key)
+                and (after is None or task.sort_key < after.sort_key)):
+            return  # Solto no mesmo lugar
+        
+        # Atualização otimista: o card fica onde foi solto e volta em caso de erro.
+        # Só a linha movida recebe um rank novo; a coluna não é renumerada.
+        rank = self.ranks_for_drop(before, after, 1)[0]
+        moved_task = self.moved_task(task, new_column_id, rank)
+        self.show_task_card(moved_task)
+        
+        def rollback(e):
+            self.show_task_card(task)
+            QMessageBox.warning(self, "Erro de DB", f"Erro ao atualizar coluna: {e}")
+        
+        self.db_worker.submit(
+            self.db_worker.db.move_task, task_id, new_column_id, rank,
+            on_result=lambda _: self.task_saved.emit(moved_task),
+            on_error=rollback
+        )
+
+    def open_new_task_dialog(self, titulo=""):
+        # Com um diálogo já aberto (ex.: dois "--add" seguidos) só o traz para frente
+        modal = QApplication.activeModalWidget()
+        if modal is not None:
+            modal.raise_()
+            modal.activateWindow()
+            return
+        
         dialog = NewTaskDialog(self)
+        dialog.titulo_edit.setText(titulo)
         if dialog.exec():
             data = dialog.get_data()
             if not data['titulo']:
@@ -468,41 +1957,34 @@ class MainWindow(QMainWindow):
                 return
             
             self.db_insert_task(data)
-            self.load_and_display_tasks()
 
     def db_insert_task(self, data):
-        conn = self.db_connection_func()
-        if conn is None:
-            QMessageBox.warning(self, "Erro de DB", "Não foi possível conectar ao DB para criar a tarefa.")
-            return
-
-        query = """
-            INSERT INTO tasks (titulo, descricao, notificar_em, coluna) 
-            VALUES (?, ?, ?, 'todo')
-        """
-        values = (
-            data['titulo'], 
-            data['descricao'], 
-            data['notificar_em'].strftime("%Y-%m-%d %H:%M:%S")
-        )
+        # Tarefas novas entram no topo da primeira coluna do quadro ativo
+        if self.board is None:
+            return
+        column_id = next(iter(self.board.columns))
         
-        cursor = conn.cursor()
-        try:
-            cursor.execute(query, values)
-            conn.commit()
-        except sqlite3.Error as e:
-            QMessageBox.warning(self, "Erro de DB", f"Erro ao inserir tarefa: {e}")
-        finally:
-            conn.close()
+        def inserted(row):
+            task = Task.from_row(row)
+            self.show_task_card(task)
+            self.task_saved.emit(task)
+            self.refresh_search()
+        
+        self.db_worker.submit(
+            self.db_worker.db.insert_task, data['titulo'], data['descricao'], data['notificar_em'], column_id,
+            on_result=inserted,
+            on_error=lambda e: QMessageBox.warning(self, "Erro de DB", f"Erro ao inserir tarefa: {e}")
+        )
 
     def on_edit_task(self, task_id):
-        task_data_row = self.load_tasks_from_db(task_id=task_id)
-        if not task_data_row:
+        if not self.board_loaded:
+            return
+        task = self.find_task(task_id)
+        if task is None:
             QMessageBox.warning(self, "Erro", "Não foi possível carregar a tarefa para edição.")
             return
         
-        task_data = dict(task_data_row)
-        dialog = EditTaskDialog(task_data, self)
+        dialog = EditTaskDialog(task, self)
         
         if dialog.exec():
             new_data = dialog.get_data()
@@ -511,42 +1993,41 @@ class MainWindow(QMainWindow):
                 return
             
             self.db_update_task(task_id, new_data)
-            self.load_and_display_tasks()
             
     def db_update_task(self, task_id, data):
-        conn = self.db_connection_func()
-        if conn is None:
-            QMessageBox.warning(self, "Erro de DB", "Não foi possível conectar ao DB para atualizar a tarefa.")
-            return
-
-        query = """
-            UPDATE tasks SET 
-                titulo = ?, 
-                descricao = ?, 
-                notificar_em = ?,
-                notificado = 0, 
-                notificado_10d = 0, 
-                notificado_5d = 0, 
-                notificado_1d = 0
-            WHERE id = ?
-        """
-        values = (
-            data['titulo'], 
-            data['descricao'], 
-            data['notificar_em'].strftime("%Y-%m-%d %H:%M:%S"),
-            task_id
-        )
+        old_task = self.find_task(task_id)
+        if old_task is not None:
+            self.show_task_card(old_task.replace(
+                titulo=data['titulo'],
+                descricao=data['descricao'],
+                notificar_em=to_epoch(data['notificar_em']),
+                notificado=0, notificado_10d=0, notificado_5d=0, notificado_1d=0
+            ))
         
-        cursor = conn.cursor()
-        try:
-            cursor.execute(query, values)
-            conn.commit()
-        except sqlite3.Error as e:
+        def updated(row):
+            if row is None:
+                self.remove_task_card(task_id)
+                self.task_deleted.emit(task_id)
+            else:
+                task = Task.from_row(row)
+                self.show_task_card(task)
+                self.task_saved.emit(task)
+                self.refresh_search()
+        
+        def rollback(e):
+            if old_task is not None:
+                self.show_task_card(old_task)
             QMessageBox.warning(self, "Erro de DB", f"Erro ao atualizar tarefa: {e}")
-        finally:
-            conn.close()
+        
+        self.db_worker.submit(
+            self.db_worker.db.update_task, task_id, data['titulo'], data['descricao'], data['notificar_em'],
+            on_result=updated,
+            on_error=rollback
+        )
 
     def on_delete_task(self, task_id):
+        if not self.board_loaded:
+            return
         reply = QMessageBox.question(self, "Confirmar Exclusão",
                                      "Tem certeza que deseja excluir esta tarefa?",
                                      QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
@@ -554,35 +2035,354 @@ class MainWindow(QMainWindow):
         
         if reply == QMessageBox.StandardButton.Yes:
             self.db_delete_task(task_id)
-            self.load_and_display_tasks()
             
-    def db_delete_task(self, task_id):
-        conn = self.db_connection_func()
-        if conn is None:
-            QMessageBox.warning(self, "Erro de DB", "Não foi possível conectar ao DB para excluir a tarefa.")
+    def on_delete_tasks(self, task_ids):
+        if not self.board_loaded or not task_ids:
             return
-            
-        cursor = conn.cursor()
-        try:
-            query = "DELETE FROM tasks WHERE id = ?"
-            cursor.execute(query, (task_id,))
-            conn.commit()
-        except sqlite3.Error as e:
+        if len(task_ids) == 1:
+            self.on_delete_task(task_ids[0])
+            return
+        
+        reply = QMessageBox.question(self, "Confirmar Exclusão",
+                                     f"Tem certeza que deseja excluir {len(task_ids)} tarefas?",
+                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                                     QMessageBox.StandardButton.No)
+        
+        if reply == QMessageBox.StandardButton.Yes:
+            self.db_delete_tasks(task_ids)
+
+    def db_delete_tasks(self, task_ids):
+        old_tasks = [task for task in map(self.find_task, task_ids) if task is not None]
+        deleted_ids = [task.id for task in old_tasks]
+        self.update_cards(deleted_ids, [])
+        
+        def deleted(_):
+            for task_id in deleted_ids:
+                self.task_deleted.emit(task_id)
+            self.statusBar().showMessage(f"{len(deleted_ids)} tarefa(s) excluída(s). Ctrl+Z desfaz.", STATUS_MESSAGE_MS)
+        
+        def rollback(e):
+            self.update_cards([], old_tasks)
+            QMessageBox.warning(self, "Erro de DB", f"Erro ao excluir tarefas: {e}")
+        
+        self.db_worker.submit(
+            self.db_worker.db.delete_tasks, deleted_ids,
+            on_result=deleted,
+            on_error=rollback
+        )
+
+    def db_delete_task(self, task_id):
+        old_task = self.find_task(task_id)
+        self.remove_task_card(task_id)
+        
+        def rollback(e):
+            if old_task is not None:
+                self.show_task_card(old_task)
             QMessageBox.warning(self, "Erro de DB", f"Erro ao excluir tarefa: {e}")
-        finally:
-            conn.close()
+        
+        def deleted(_):
+            self.task_deleted.emit(task_id)
+            self.statusBar().showMessage("Tarefa excluída. Ctrl+Z desfaz.", STATUS_MESSAGE_MS)
+        
+        self.db_worker.submit(
+            self.db_worker.db.delete_task, task_id,
+            on_result=deleted,
+            on_error=rollback
+        )
+
+    def replay_operation(self, redo=False):
+        if not self.board_loaded:
+            return
+        
+        def replayed(result):
+            if result is None:
+                self.statusBar().showMessage("Nada para refazer." if redo else "Nada para desfazer.", STATUS_MESSAGE_MS)
+                return
+            descricao, task_ids, tasks = result
+            # Uma única atualização em lote dos cards afetados, sem recarregar o quadro
+            self.update_cards(task_ids, self.visible_tasks(tasks))
+            restored_ids = {task.id for task in tasks}
+            for task in tasks:
+                self.task_saved.emit(task)
+            for task_id in task_ids:
+                if task_id not in restored_ids:
+                    self.task_deleted.emit(task_id)
+            self.refresh_search()
+            self.statusBar().showMessage(f"{'Refeito' if redo else 'Desfeito'}: {descricao}", STATUS_MESSAGE_MS)
+        
+        self.db_worker.submit(
+            replay_operation, self.db_worker.db, redo,
+            on_result=replayed,
+            on_error=lambda e: QMessageBox.warning(
+                self, "Erro", f"Não foi possível {'refazer' if redo else 'desfazer'} a operação.\n{e}"
+            )
+        )
+
+    def show_stats(self):
+        if self.stats_dialog is None:
+            self.stats_dialog = StatsDialog(self)
+            self.stats_dialog.refresh_requested.connect(self.load_stats)
+        self.stats_dialog.show()
+        self.stats_dialog.raise_()
+        self.load_stats()
+
+    def load_stats(self):
+        if self.board is None:
+            return
+        view = self.board
+        requested_at = time.perf_counter()
+        
+        def loaded(stats):
+            metrics.observe("stats.load", (time.perf_counter() - requested_at) * 1000)
+            if view is self.board:
+                self.stats_dialog.show_stats(view.nome, stats)
+        
+        self.db_worker.submit(
+            self.db_worker.db.board_stats, view.board_id,
+            on_result=loaded,
+            on_error=lambda e: QMessageBox.warning(self, "Erro de DB", f"Erro ao carregar estatísticas: {e}")
+        )
+
+    def create_board(self):
+        nome, ok = QInputDialog.getText(self, "Novo quadro", "Nome do quadro:")
+        nome = nome.strip()
+        if not ok or not nome:
+            return
+        
+        def created(board):
+            self.load_boards()
+            self.switch_board(board['id'])
+        
+        self.db_worker.submit(
+            self.db_worker.db.create_board, nome,
+            on_result=created,
+            on_error=lambda e: QMessageBox.warning(self, "Erro de DB", f"Erro ao criar quadro: {e}")
+        )
+    
+    def rename_board(self):
+        if self.board is None:
+            return
+        view = self.board
+        nome, ok = QInputDialog.getText(self, "Renomear quadro", "Nome do quadro:", text=view.nome)
+        nome = nome.strip()
+        if not ok or not nome or nome == view.nome:
+            return
+        
+        def renamed(_):
+            view.nome = nome
+            self.load_boards()
+        
+        self.db_worker.submit(
+            self.db_worker.db.rename_board, view.board_id, nome,
+            on_result=renamed,
+            on_error=lambda e: QMessageBox.warning(self, "Erro de DB", f"Erro ao renomear quadro: {e}")
+        )
+    
+    def create_column(self):
+        if not self.board_loaded:
+            return
+        board_id = self.board.board_id
+        nome, ok = QInputDialog.getText(self, "Nova coluna", "Nome da coluna:")
+        nome = nome.strip()
+        if not ok or not nome:
+            return
+        
+        # A coluna entra no fim do quadro, que é remontado com ela
+        self.db_worker.submit(
+            self.db_worker.db.create_column, board_id, nome,
+            on_result=lambda _: self.load_board(board_id),
+            on_error=lambda e: QMessageBox.warning(self, "Erro de DB", f"Erro ao criar coluna: {e}")
+        )
+    
+    def show_column_menu(self, column_id, global_pos):
+        if not self.board_loaded:
+            return
+        view = self.board
+        column = view.columns[column_id]
+        
+        menu = QMenu(self)
+        rename_action = menu.addAction("Renomear coluna...")
+        delete_action = menu.addAction("Excluir coluna")
+        chosen = menu.exec(global_pos)
+        
+        if chosen is rename_action:
+            current = column.title_label.text()
+            nome, ok = QInputDialog.getText(self, "Renomear coluna", "Nome da coluna:", text=current)
+            nome = nome.strip()
+            if not ok or not nome or nome == current:
+                return
+            self.db_worker.submit(
+                self.db_worker.db.rename_column, column_id, nome,
+                on_result=lambda _: view.rename_column(column_id, nome),
+                on_error=lambda e: QMessageBox.warning(self, "Erro de DB", f"Erro ao renomear coluna: {e}")
+            )
+        elif chosen is delete_action:
+            reply = QMessageBox.question(self, "Confirmar Exclusão",
+                                         f"Excluir a coluna '{column.title_label.text()}'?",
+                                         QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                                         QMessageBox.StandardButton.No)
+            if reply != QMessageBox.StandardButton.Yes:
+                return
+            # Só colunas vazias (no banco, não só nas páginas carregadas) podem sair
+            self.db_worker.submit(
+                self.db_worker.db.delete_column, column_id,
+                on_result=lambda _: self.load_board(view.board_id),
+                on_error=lambda e: QMessageBox.warning(self, "Erro", f"Não foi possível excluir a coluna.\n{e}")
+            )
+    
+    def import_tasks_from_file(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Importar tarefas", "", IMPORT_EXPORT_FILTERS)
+        if not path:
+            return
+        
+        self.statusBar().showMessage(f"Importando tarefas de '{os.path.basename(path)}'...")
+        
+        def imported(count):
+            # O quadro é recarregado uma única vez, ao fim da importação
+            self.statusBar().showMessage(f"{count} tarefa(s) importada(s).", STATUS_MESSAGE_MS)
+            # A importação pode ter criado quadros e colunas
+            self.load_boards()
+            self.load_and_display_tasks()
+            self.tasks_imported.emit(count)
+        
+        def failed(e):
+            self.statusBar().clearMessage()
+            QMessageBox.warning(self, "Erro na importação", f"Nenhuma tarefa foi importada.\n{e}")
+        
+        self.db_worker.submit(
+            kanban_io.import_tasks, self.db_worker.db, path,
+            on_result=imported,
+            on_error=failed
+        )
+
+    def export_tasks_to_file(self):
+        path, selected_filter = QFileDialog.getSaveFileName(
+            self, "Exportar tarefas", "tarefas.csv", IMPORT_EXPORT_FILTERS
+        )
+        if not path:
+            return
+        if os.path.splitext(path)[1].lower() not in kanban_io.FORMATS_BY_EXTENSION:
+            path += ".jsonl" if selected_filter.startswith("JSON") else ".csv"
+        
+        self.statusBar().showMessage(f"Exportando tarefas para '{os.path.basename(path)}'...")
+        
+        def failed(e):
+            self.statusBar().clearMessage()
+            QMessageBox.warning(self, "Erro na exportação", f"Erro ao exportar tarefas: {e}")
+        
+        self.db_worker.submit(
+            kanban_io.export_tasks, self.db_worker.db, path,
+            on_result=lambda count: self.statusBar().showMessage(
+                f"{count} tarefa(s) exportada(s) para '{path}'.", STATUS_MESSAGE_MS
+            ),
+            on_error=failed
+        )
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        # De volta da bandeja: o que mudou enquanto estava oculta aparece já
+        self.sync_timer.setInterval(SYNC_POLL_MS)
+        self.sync_changes()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.sync_timer.setInterval(SYNC_HIDDEN_POLL_MS)
 
     def closeEvent(self, event):
         event.ignore()
         self.hide()
 
+class SingleInstance(QObject):
+    message_received = pyqtSignal(dict)
+
+    def __init__(self, db_path, parent=None):
+        super().__init__(parent)
+        self.server_name = instance_server_name(db_path)
+        self.lock = QLockFile(os.path.splitext(db_path)[0] + INSTANCE_LOCK_SUFFIX)
+        # Sem prazo de validade: o lock só é abandonado se o processo dono morreu
+        self.lock.setStaleLockTime(0)
+        self.server = None
+
+    def acquire(self):
+        if not self.lock.tryLock(0):
+            return False
+        # Socket que sobrou de um processo que caiu impediria o listen
+        QLocalServer.removeServer(self.server_name)
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.SocketOption.UserAccessOption)
+        self.server.newConnection.connect(self.on_new_connection)
+        if not self.server.listen(self.server_name):
+            print(f"Aviso: canal de instância única indisponível: {self.server.errorString()}")
+        return True
+
+    def release(self):
+        if self.server is not None:
+            self.server.close()
+        self.lock.unlock()
+
+    def send(self, message):
+        data = (json.dumps(message, ensure_ascii=False) + "\n").encode('utf-8')
+        for _ in range(INSTANCE_CONNECT_ATTEMPTS):
+            socket = QLocalSocket()
+            socket.connectToServer(self.server_name)
+            if socket.waitForConnected(INSTANCE_CONNECT_TIMEOUT_MS):
+                socket.write(data)
+                sent = socket.waitForBytesWritten(INSTANCE_CONNECT_TIMEOUT_MS)
+                socket.disconnectFromServer()
+                return sent
+            # A instância em execução pode ainda estar abrindo o servidor
+            time.sleep(INSTANCE_CONNECT_TIMEOUT_MS / 1000)
+        return False
+
+    def on_new_connection(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            socket.readyRead.connect(lambda socket=socket: self.read_messages(socket))
+            socket.disconnected.connect(socket.deleteLater)
+            self.read_messages(socket)
+
+    def read_messages(self, socket):
+        while socket.canReadLine():
+            line = bytes(socket.readLine()).decode('utf-8', 'replace')
+            try:
+                message = json.loads(line)
+            except ValueError:
+                print(f"Mensagem inválida de outra instância: {line!r}")
+                continue
+            if isinstance(message, dict):
+                self.message_received.emit(message)
+
 class KanbanApp:
-    def __init__(self):
+    def __init__(self, db_path=None, command=None):
         self.app = QApplication(sys.argv)
         self.app.setStyleSheet(DARK_MODE_STYLESHEET)
         
         self.app.setQuitOnLastWindowClosed(False) 
-        self.toaster = ToastNotifier() if ToastNotifier else None
+        # O backend de toast só é importado na primeira notificação
+        self.toaster = None
+        self.toaster_loaded = False
+        self.tray_icon = None
+        self.notifier = None
+        self.startup_finished = False
+        
+        self.db_path = db_path or default_db_path()
+        self.instance = SingleInstance(self.db_path, self.app)
+        if not self.instance.acquire():
+            # Já existe uma instância com este banco: ela recebe o comando e este
+            # processo termina antes de abrir banco, janela ou timers
+            if self.instance.send(command or SHOW_COMMAND):
+                print("O aplicativo já está aberto; comando enviado à instância em execução.")
+                sys.exit(0)
+            QMessageBox.critical(None, APP_TITLE,
+                "O aplicativo já está em execução, mas não respondeu.\n"
+                "Feche-o pela bandeja do sistema e tente novamente.")
+            sys.exit(1)
+        
+        self.snapshot_path = board_snapshot_path(self.db_path)
+        self.setup_metrics()
+        self.db = Database(self.db_path)
+        self.db_worker = DatabaseWorker(self.db)
+        self.app.aboutToQuit.connect(self.shutdown)
         
         if not self.init_db():
             QMessageBox.critical(None, "Erro de Banco de Dados", 
@@ -591,55 +2391,71 @@ class KanbanApp:
                 "O aplicativo será fechado.")
             sys.exit(1)
             
-        self.window = MainWindow(self.create_db_connection)
+        self.db_worker.start()
+        self.window = MainWindow(self.db_worker, snapshot=load_board_snapshot(self.snapshot_path))
+        self.window.tray_icon = None
         
-        self.setup_tray_icon()
-        self.setup_notification_timer()
-
-        self.window.tray_icon = self.tray_icon 
+        # A janela aparece primeiro; o resto da inicialização espera a primeira pintura
+        self.window.first_painted.connect(self.finish_startup)
+        QTimer.singleShot(STARTUP_DEFER_MAX_MS, self.finish_startup)
         self.window.show()
+        
+        self.instance.message_received.connect(self.on_instance_message)
+        if command is not None and command.get('command') != 'show':
+            QTimer.singleShot(0, lambda: self.on_instance_message(command))
 
     def run(self):
         sys.exit(self.app.exec())
 
-    def create_db_connection(self):
-        try:
-            connection = sqlite3.connect(KANBAN_DB_FILE)
-            return connection
-        except sqlite3.Error as e:
-            print(f"Erro ao conectar ao SQLite: {e}")
-            return None
+    def finish_startup(self):
+        if self.startup_finished:
+            return
+        self.startup_finished = True
+        with metrics.span("startup.deferred"):
+            self.setup_tray_icon()
+            self.window.tray_icon = self.tray_icon
+            self.setup_notification_timer()
+            self.setup_archive_timer()
 
-    def init_db(self):
-        conn = self.create_db_connection()
-        if conn is None:
-            return False
+    def shutdown(self):
+        if self.window.board_loaded:
+            save_board_snapshot(self.snapshot_path, self.window.snapshot_board())
+        self.db_worker.stop()
+        if self.notifier is not None:
+            self.notifier.stop()
+        self.db.close()
+        self.instance.release()
+        metrics.flush()
+
+    def on_instance_message(self, message):
+        # Novo lançamento do aplicativo: a janela volta da bandeja para frente
+        self.window.setWindowState(self.window.windowState() & ~Qt.WindowState.WindowMinimized)
+        self.window.show()
+        self.window.raise_()
+        self.window.activateWindow()
+        if message.get('command') == 'add':
+            self.window.open_new_task_dialog(message.get('titulo') or "")
+
+    def setup_metrics(self):
+        if not profiling_requested():
+            return
+        log_path = os.path.join(os.path.dirname(os.path.abspath(self.db_path)), METRICS_LOG_FILE_NAME)
+        metrics.enable(log_path=log_path)
+        print(f"Instrumentação ativa; métricas em '{log_path}'.")
         
-        create_table_sql = """
-        CREATE TABLE IF NOT EXISTS tasks (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            titulo TEXT NOT NULL,
-            descricao TEXT,
-            coluna TEXT NOT NULL DEFAULT 'todo',
-            data_criacao DATETIME DEFAULT CURRENT_TIMESTAMP,
-            notificar_em DATETIME,
-            notificado INTEGER NOT NULL DEFAULT 0,
-            notificado_10d INTEGER NOT NULL DEFAULT 0,
-            notificado_5d INTEGER NOT NULL DEFAULT 0,
-            notificado_1d INTEGER NOT NULL DEFAULT 0
-        );
-        """
+        self.metrics_timer = QTimer(self.app)
+        self.metrics_timer.timeout.connect(metrics.flush)
+        self.metrics_timer.start(METRICS_FLUSH_INTERVAL_MS)
+
+    def init_db(self):
         try:
-            cursor = conn.cursor()
-            cursor.execute(create_table_sql)
-            conn.commit()
-            print(f"Banco de dados '{KANBAN_DB_FILE}' inicializado com sucesso.")
+            with metrics.span("db.init_schema"):
+                self.db.init_schema()
+            print(f"Banco de dados '{self.db_path}' inicializado com sucesso.")
             return True
         except sqlite3.Error as e:
             print(f"Erro ao criar tabela: {e}")
             return False
-        finally:
-            conn.close()
         
     def setup_tray_icon(self):
         icon_path = APP_ICON_FILE
@@ -678,127 +2494,112 @@ class KanbanApp:
                 self.window.activateWindow()
 
     def setup_notification_timer(self):
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.check_for_notifications)
-        self.timer.start(60 * 1000) 
+        self.notifier = NotificationDispatcher(self.load_toaster)
+        self.notifier.fallback_requested.connect(self.show_tray_notification)
+        self.notifier.start()
+        
+        self.scheduler = DeadlineScheduler(self.app)
+        self.scheduler.due.connect(self.check_for_notifications)
+        self.window.task_saved.connect(self.scheduler.schedule_task)
+        self.window.task_deleted.connect(self.scheduler.unschedule_task)
+        self.window.tasks_imported.connect(self.on_tasks_imported)
+        
         self.check_for_notifications()
+        self.load_pending_deadlines()
 
-    def check_for_notifications(self):
-        print(f"[{QDateTime.currentDateTime().toString()}] Verificando banco de dados SQLite...")
-        
-        conn = self.create_db_connection()
-        if conn is None:
+    def setup_archive_timer(self):
+        self.archive_days = archive_after_days()
+        if self.archive_days <= 0:
             return
+        self.archive_timer = QTimer(self.app)
+        self.archive_timer.timeout.connect(self.archive_done_tasks)
+        self.archive_timer.start(ARCHIVE_INTERVAL_MS)
+        self.archive_done_tasks()
 
-        conn.row_factory = sqlite3.Row 
-        cursor = conn.cursor()
+    def archive_done_tasks(self):
+        def archived(task_ids):
+            if task_ids:
+                self.window.remove_archived_tasks(task_ids)
+                print(f"{len(task_ids)} tarefa(s) concluída(s) arquivada(s).")
         
-        try:
-            query_10d = """
-                SELECT * FROM tasks 
-                WHERE notificar_em <= datetime('now', 'localtime', '+10 days')
-                  AND notificar_em > datetime('now', 'localtime', '+5 days')
-                  AND notificado_10d = 0 
-                  AND notificar_em IS NOT NULL
-            """
-            cursor.execute(query_10d)
-            for tarefa in cursor.fetchall():
-                print(f"Disparando aviso (10D): {tarefa['titulo']}")
-                self.show_notification(
-                    f"Aviso: {tarefa['titulo']}",
-                    f"Faltam 10 dias para sua tarefa."
-                )
-                self.db_update_warning_status(tarefa['id'], "notificado_10d")
-
-            query_5d = """
-                SELECT * FROM tasks 
-                WHERE notificar_em <= datetime('now', 'localtime', '+5 days')
-                  AND notificar_em > datetime('now', 'localtime', '+1 day')
-                  AND notificado_5d = 0 
-                  AND notificar_em IS NOT NULL
-            """
-            cursor.execute(query_5d)
-            for tarefa in cursor.fetchall():
-                print(f"Disparando aviso (5D): {tarefa['titulo']}")
-                self.show_notification(
-                    f"Atenção: {tarefa['titulo']}",
-                    f"Faltam 5 dias para sua tarefa."
-                )
-                self.db_update_warning_status(tarefa['id'], "notificado_5d")
-                
-            query_1d = """
-                SELECT * FROM tasks 
-                WHERE notificar_em <= datetime('now', 'localtime', '+1 day')
-                  AND notificar_em > datetime('now', 'localtime')
-                  AND notificado_1d = 0 
-                  AND notificar_em IS NOT NULL
-            """
-            cursor.execute(query_1d)
-            for tarefa in cursor.fetchall():
-                print(f"Disparando aviso (1D): {tarefa['titulo']}")
-                self.show_notification(
-                    f"Urgente: {tarefa['titulo']}",
-                    f"Falta 1 dia para sua tarefa!"
-                )
-                self.db_update_warning_status(tarefa['id'], "notificado_1d")
-
-            query_now = """
-                SELECT * FROM tasks 
-                WHERE notificar_em <= datetime('now', 'localtime')
-                  AND notificado = 0 
-                  AND notificar_em IS NOT NULL
-            """
-            cursor.execute(query_now)
-            for tarefa in cursor.fetchall():
-                print(f"Disparando notificação FINAL: {tarefa['titulo']}")
-                self.show_notification(
-                    f"Lembrete: {tarefa['titulo']}",
-                    f"Sua tarefa '{tarefa['titulo']}' está agendada para agora."
-                )
-                self.db_update_warning_status(tarefa['id'], "notificado")
+        self.db_worker.submit(
+            self.db.archive_done_tasks, self.archive_days,
+            on_result=archived,
+            on_error=lambda e: print(f"Erro ao arquivar tarefas: {e}")
+        )
 
-        except sqlite3.Error as e:
-            print(f"Erro ao verificar notificações: {e}")
-        finally:
-            conn.close()
+    def on_tasks_imported(self, count):
+        self.check_for_notifications()
+        self.load_pending_deadlines()
 
-    def db_update_warning_status(self, task_id, column_name):
-        allowed_columns = ['notificado', 'notificado_10d', 'notificado_5d', 'notificado_1d']
-        if column_name not in allowed_columns:
-            print(f"Erro: Tentativa de atualizar coluna inválida: {column_name}")
-            return
+    def load_pending_deadlines(self):
+        self.db_worker.submit(
+            self.db.list_pending_deadlines,
+            on_result=self.scheduler.load,
+            on_error=lambda e: print(f"Erro ao carregar prazos pendentes: {e}")
+        )
 
-        conn = self.create_db_connection()
-        if conn is None:
-            return
+    def check_for_notifications(self):
+        print(f"[{QDateTime.currentDateTime().toString()}] Verificando banco de dados SQLite...")
+        metrics.incr("notifications.ticks")
+        requested_at = time.perf_counter()
+        
+        def claimed(due):
+            self.dispatch_notifications(due)
+            metrics.observe("notifications.tick_total", (time.perf_counter() - requested_at) * 1000)
+        
+        self.db_worker.submit(
+            self.db.claim_due_notifications,
+            on_result=claimed,
+            on_error=lambda e: print(f"Erro ao verificar notificações: {e}")
+        )
+
+    def dispatch_notifications(self, due):
+        with metrics.span("notifications.dispatch"):
+            titulos_by_flag = {}
+            for tarefa in due:
+                titulos_by_flag.setdefault(tarefa['flag'], []).append(tarefa['titulo'])
             
-        cursor = conn.cursor()
-        try:
-            query = f"UPDATE tasks SET {column_name} = 1 WHERE id = ?"
-            cursor.execute(query, (task_id,))
-            conn.commit()
-            print(f"Tarefa {task_id} marcada como '{column_name}'.")
-        except sqlite3.Error as e:
-            print(f"Erro ao atualizar status da tarefa {task_id}: {e}")
-        finally:
-            conn.close()
+            # Do limiar mais urgente para o menos urgente, um aviso por limiar
+            for flag, _, _ in reversed(NOTIFICATION_TIERS):
+                titulos = titulos_by_flag.get(flag)
+                if not titulos:
+                    continue
+                label, title, message = NOTIFICATION_MESSAGES[flag]
+                if len(titulos) == 1:
+                    print(f"Disparando {label}: {titulos[0]}")
+                    self.show_notification(title.format(titulo=titulos[0]), message.format(titulo=titulos[0]))
+                else:
+                    print(f"Disparando {label} para {len(titulos)} tarefas")
+                    title, message = NOTIFICATION_SUMMARIES[flag]
+                    self.show_notification(
+                        title.format(count=len(titulos)),
+                        message.format(titulos=summarize_titles(titulos))
+                    )
+        metrics.incr("notifications.sent", len(due))
+        if due:
+            print(f"{len(due)} aviso(s) marcados como enviados.")
 
-    def show_notification(self, title, message):
-        if self.toaster:
+    def load_toaster(self):
+        if not self.toaster_loaded:
+            self.toaster_loaded = True
             try:
-                self.toaster.show_toast(
-                    title,
-                    message,
-                    duration=10,
-                    threaded=True
-                )
-            except Exception as e:
-                print(f"Erro ao mostrar notificação: {e}")
-        else:
-            print(f"NOTIFICAÇÃO (simulada): {title} - {message}")
-            if self.tray_icon:
-                 self.tray_icon.showMessage(title, message, QSystemTrayIcon.MessageIcon.Information, 10000)
+                from win10toast import ToastNotifier
+                self.toaster = ToastNotifier()
+            except ImportError:
+                self.toaster = None
+        return self.toaster
+
+    def show_notification(self, title, message):
+        self.notifier.submit(title, message)
+
+    def show_tray_notification(self, title, message):
+        print(f"NOTIFICAÇÃO (simulada): {title} - {message}")
+        if self.tray_icon:
+            self.tray_icon.showMessage(
+                title, message, QSystemTrayIcon.MessageIcon.Information, NOTIFICATION_DURATION_S * 1000
+            )
 
 if __name__ == "__main__":
-    app = KanbanApp()
+    app = KanbanApp(command=parse_instance_command(sys.argv[1:]))
     app.run()
\ No newline at end of file
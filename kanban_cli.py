@@ -0,0 +1,242 @@
+"""Linha de comando do quadro Kanban, sem interface gráfica.
+
+Usa o mesmo banco e a mesma camada de dados do aplicativo (kanban_db,
+kanban_io), mas não importa o PyQt6: cada comando abre o banco, faz o seu
+trabalho e sai. Uma janela aberta recebe as mudanças sozinha.
+
+    python kanban_cli.py add "Pagar conta" --prazo "2026-11-05 18:00"
+    python kanban_cli.py move 12 15 done
+    python kanban_cli.py list --coluna todo --json
+    python kanban_cli.py --quadro Casa list
+    python kanban_cli.py boards
+    python kanban_cli.py due --dias 3
+    python kanban_cli.py stats
+    python kanban_cli.py undo
+    python kanban_cli.py export tarefas.csv
+"""
+import argparse
+import json
+import sqlite3
+import sys
+from datetime import datetime, timedelta, timezone
+
+from kanban_db import (
+    STATS_WEEK_SECONDS, STATS_WEEKS, Database, default_db_path, format_datetime, from_epoch, parse_datetime,
+)
+
+OUTPUT_FIELDS = ('id', 'titulo', 'descricao', 'coluna', 'data_criacao', 'notificar_em')
+
+
+def parse_deadline(value):
+    deadline = parse_datetime(value)
+    if deadline is None:
+        raise argparse.ArgumentTypeError(f"prazo inválido: {value!r} (use AAAA-MM-DD ou 'AAAA-MM-DD HH:MM')")
+    return deadline
+
+
+def format_epoch(value):
+    # Saída em texto, no horário local, como o prazo é digitado
+    return format_datetime(from_epoch(value)) if value is not None else None
+
+
+def print_tasks(db, rows, as_json):
+    # No banco a coluna é um id; na saída vale a chave, como nos argumentos
+    keys = dict(db.connection().execute("SELECT id, chave FROM columns"))
+    for row in rows:
+        row = dict(row, coluna=keys[row['coluna']])
+        if as_json:
+            # Uma tarefa por linha (JSON Lines), fácil de consumir em scripts
+            task = {field: row[field] for field in OUTPUT_FIELDS}
+            task['data_criacao'] = format_epoch(task['data_criacao'])
+            task['notificar_em'] = format_epoch(task['notificar_em'])
+            print(json.dumps(task, ensure_ascii=False))
+        else:
+            print(f"{row['id']:>6}  {row['coluna']:<8}  {(format_epoch(row['notificar_em']) or '-')[:16]:<16}  {row['titulo']}")
+
+
+def resolve_board(db, args):
+    # --quadro aceita o nome ou o id; sem ele vale o primeiro quadro
+    board = db.find_board(args.quadro) if args.quadro else db.get_board(None)
+    if board is None:
+        raise ValueError(f"quadro desconhecido: {args.quadro!r}")
+    return board
+
+
+def resolve_column(db, board, chave):
+    if chave is None:
+        return db.list_columns(board['id'])[0]
+    column = db.find_column(board['id'], chave)
+    if column is None:
+        chaves = ', '.join(row['chave'] for row in db.list_columns(board['id']))
+        raise ValueError(f"coluna desconhecida em '{board['nome']}': {chave!r} (use {chaves})")
+    return column
+
+
+def command_add(db, args):
+    column_id = resolve_column(db, resolve_board(db, args), args.coluna)['id']
+    # "-" lê um título por linha da entrada padrão
+    titulos = [line.strip() for line in sys.stdin] if args.titulo == '-' else [args.titulo]
+    # O lote vai junto para o topo da coluna, na ordem da entrada, e um único
+    # undo o desfaz
+    task_ids = db.insert_tasks([titulo for titulo in titulos if titulo], args.descricao, args.prazo, column_id)
+    for task_id in task_ids:
+        print(task_id)
+    return 0
+
+
+def command_move(db, args):
+    column_id = resolve_column(db, resolve_board(db, args), args.coluna)['id']
+    moved = db.move_tasks_to_top(args.ids, column_id)
+    if moved < len(args.ids):
+        print(f"{len(args.ids) - moved} tarefa(s) não encontrada(s).", file=sys.stderr)
+        return 1
+    return 0
+
+
+def command_list(db, args):
+    board = resolve_board(db, args)
+    if args.coluna:
+        rows = db.list_column_tasks(resolve_column(db, board, args.coluna)['id'])
+    else:
+        rows = db.list_tasks(board['id'])
+    print_tasks(db, rows, args.json)
+    return 0
+
+
+def command_due(db, args):
+    # Os prazos valem para todos os quadros
+    print_tasks(db, db.list_due_tasks(timedelta(days=args.dias)), args.json)
+    return 0
+
+
+def command_replay(db, args):
+    # A mesma pilha de desfazer/refazer do aplicativo, guardada no banco
+    result = db.redo() if args.command == 'redo' else db.undo()
+    if result is None:
+        print("Nada para refazer." if args.command == 'redo' else "Nada para desfazer.", file=sys.stderr)
+        return 1
+    print(result[0])
+    return 0
+
+
+def command_boards(db, args):
+    for board in db.list_boards():
+        print(f"{board['id']:>6}  {board['nome']}")
+        for column in db.list_columns(board['id']):
+            marca = "  (conclui)" if column['conclui'] else ""
+            print(f"{'':>8}{column['chave']:<12}  {column['nome']}{marca}")
+    return 0
+
+
+def command_stats(db, args):
+    # Lê as tabelas de resumo, como o painel do aplicativo; --recalcular
+    # refaz os resumos a partir das tarefas e do arquivo
+    if args.recalcular:
+        db.rebuild_stats()
+    board = resolve_board(db, args)
+    stats = db.board_stats(board['id'])
+    print(board['nome'])
+    for column in stats['colunas']:
+        print(f"  {column['nome']:<20}  {column['total']:>6}")
+    print(f"  {'Atrasadas':<20}  {stats['atrasadas']:>6}")
+    for title, rows, first in (
+        ("Prazos por semana", stats['prazos'], stats['semana']),
+        ("Concluídas por semana", stats['conclusoes'], stats['semana'] - (STATS_WEEKS - 1) * STATS_WEEK_SECONDS),
+    ):
+        totals = dict(tuple(row) for row in rows)
+        print(title)
+        for semana in range(first, first + STATS_WEEKS * STATS_WEEK_SECONDS, STATS_WEEK_SECONDS):
+            label = datetime.fromtimestamp(semana, timezone.utc).strftime("%d/%m/%Y")
+            print(f"  {label:<20}  {totals.get(semana, 0):>6}")
+    count = sum(total for _, total in stats['lead_times'])
+    if count:
+        mean = sum(dias * total for dias, total in stats['lead_times']) / count
+        print(f"Lead time: {count} tarefa(s), média de {mean:.1f} dia(s)")
+    return 0
+
+
+def command_import(db, args):
+    import kanban_io
+
+    count = kanban_io.import_tasks(db, args.path, args.formato)
+    print(f"{count} tarefa(s) importada(s).", file=sys.stderr)
+    return 0
+
+
+def command_export(db, args):
+    import kanban_io
+
+    count = kanban_io.export_tasks(db, args.path, args.formato)
+    print(f"{count} tarefa(s) exportada(s) para '{args.path}'.", file=sys.stderr)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="kanban_cli", description="Organizador de Tarefas pela linha de comando")
+    parser.add_argument('--db', help="arquivo do banco (padrão: KANBAN_DB_FILE ou o banco do aplicativo)")
+    parser.add_argument('--quadro', help="nome ou id do quadro (padrão: o primeiro)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    add = commands.add_parser('add', help="cria uma tarefa")
+    add.add_argument('titulo', help="título da tarefa ('-' lê um título por linha da entrada padrão)")
+    add.add_argument('--descricao')
+    add.add_argument('--prazo', type=parse_deadline)
+    add.add_argument('--coluna', help="chave da coluna (padrão: a primeira do quadro)")
+    add.set_defaults(handler=command_add)
+
+    move = commands.add_parser('move', help="move tarefas para o topo de uma coluna")
+    move.add_argument('ids', type=int, nargs='+', metavar='ID')
+    move.add_argument('coluna', help="chave da coluna")
+    move.set_defaults(handler=command_move)
+
+    list_ = commands.add_parser('list', help="lista as tarefas na ordem do quadro")
+    list_.add_argument('--coluna', help="chave da coluna")
+    list_.add_argument('--json', action='store_true', help="uma tarefa por linha em JSON")
+    list_.set_defaults(handler=command_list)
+
+    due = commands.add_parser('due', help="tarefas não concluídas com prazo vencido ou próximo")
+    due.add_argument('--dias', type=float, default=1, help="janela a partir de agora (padrão: 1)")
+    due.add_argument('--json', action='store_true', help="uma tarefa por linha em JSON")
+    due.set_defaults(handler=command_due)
+
+    boards = commands.add_parser('boards', help="lista os quadros e as chaves das colunas")
+    boards.set_defaults(handler=command_boards)
+
+    stats = commands.add_parser('stats', help="resumo do quadro: colunas, atrasadas, prazos e conclusões")
+    stats.add_argument('--recalcular', action='store_true', help="refaz as tabelas de resumo antes de ler")
+    stats.set_defaults(handler=command_stats)
+
+    for name, help_text in (
+        ('undo', "desfaz a última operação (do aplicativo ou da linha de comando)"),
+        ('redo', "refaz a última operação desfeita"),
+    ):
+        command = commands.add_parser(name, help=help_text)
+        command.set_defaults(handler=command_replay)
+
+    for name, handler, help_text in (
+        ('import', command_import, "importa tarefas de CSV ou JSON Lines"),
+        ('export', command_export, "exporta as tarefas para CSV ou JSON Lines"),
+    ):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument('path')
+        command.add_argument('--formato', choices=('csv', 'jsonl'))
+        command.set_defaults(handler=handler)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    db = Database(args.db or default_db_path())
+    try:
+        db.init_schema()
+        return args.handler(db, args)
+    except (sqlite3.Error, ValueError, OSError) as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 1
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
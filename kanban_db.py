@@ -0,0 +1,1460 @@
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+import unicodedata
+from collections import Counter
+from datetime import datetime
+
+from kanban_rank import rank_between, rank_sequence, ranks_between
+
+APP_NAME = "OrganizadorDeTarefas"
+DB_FILE_NAME = "kanban.db"
+# Permite apontar para outro banco (testes, benchmarks, mais de um quadro)
+DB_FILE_ENV = "KANBAN_DB_FILE"
+
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+NOTIFICATION_COLUMNS = ('notificado', 'notificado_10d', 'notificado_5d', 'notificado_1d')
+
+# Colunas de todo quadro novo: (chave, nome, conclui)
+DEFAULT_COLUMNS = (
+    ('todo', "A Fazer", 0),
+    ('doing', "Fazendo", 0),
+    ('done', "Feito", 1),
+)
+DEFAULT_BOARD_NAME = "Principal"
+
+DAY_SECONDS = 24 * 60 * 60
+
+# (flag, início da janela antes do prazo, fim da janela antes do prazo), em
+# segundos; os mesmos valores das colunas geradas aviso_*_em
+NOTIFICATION_TIERS = (
+    ('notificado_10d', 10 * DAY_SECONDS, 5 * DAY_SECONDS),
+    ('notificado_5d', 5 * DAY_SECONDS, DAY_SECONDS),
+    ('notificado_1d', DAY_SECONDS, 0),
+    ('notificado', 0, None),
+)
+
+# Cache de prepared statements por conexão (sqlite3 reaproveita pelo texto SQL)
+STATEMENT_CACHE_SIZE = 256
+
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -16000",
+    "PRAGMA busy_timeout = 5000",
+)
+
+CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    titulo TEXT NOT NULL,
+    descricao TEXT,
+    coluna TEXT NOT NULL DEFAULT 'todo',
+    data_criacao DATETIME DEFAULT CURRENT_TIMESTAMP,
+    notificar_em DATETIME,
+    notificado INTEGER NOT NULL DEFAULT 0,
+    notificado_10d INTEGER NOT NULL DEFAULT 0,
+    notificado_5d INTEGER NOT NULL DEFAULT 0,
+    notificado_1d INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+CREATE_INDEXES_SQL = (
+    "CREATE INDEX IF NOT EXISTS idx_tasks_criacao ON tasks (data_criacao DESC, id DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_tasks_coluna_criacao ON tasks (coluna, data_criacao DESC, id DESC)",
+    # Índices parciais: só entram prazos ainda não notificados em cada limiar
+    "CREATE INDEX IF NOT EXISTS idx_tasks_pendente_10d ON tasks (notificar_em) WHERE notificado_10d = 0",
+    "CREATE INDEX IF NOT EXISTS idx_tasks_pendente_5d ON tasks (notificar_em) WHERE notificado_5d = 0",
+    "CREATE INDEX IF NOT EXISTS idx_tasks_pendente_1d ON tasks (notificar_em) WHERE notificado_1d = 0",
+    "CREATE INDEX IF NOT EXISTS idx_tasks_pendente ON tasks (notificar_em) WHERE notificado = 0",
+)
+
+
+def _migration_create_tasks(conn):
+    conn.execute(CREATE_TABLE_SQL)
+
+
+def _migration_indexes(conn):
+    for statement in CREATE_INDEXES_SQL:
+        conn.execute(statement)
+
+
+# Índice FTS5 de conteúdo externo espelhando titulo/descricao, mantido por triggers
+FTS_INSERT_TRIGGER_SQL = """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts (rowid, titulo, descricao) VALUES (new.id, new.titulo, new.descricao);
+    END
+"""
+CREATE_FTS_SQL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+        titulo, descricao,
+        content = 'tasks', content_rowid = 'id',
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    FTS_INSERT_TRIGGER_SQL,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN
+        INSERT INTO tasks_fts (tasks_fts, rowid, titulo, descricao) VALUES ('delete', old.id, old.titulo, old.descricao);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF titulo, descricao ON tasks BEGIN
+        INSERT INTO tasks_fts (tasks_fts, rowid, titulo, descricao) VALUES ('delete', old.id, old.titulo, old.descricao);
+        INSERT INTO tasks_fts (rowid, titulo, descricao) VALUES (new.id, new.titulo, new.descricao);
+    END
+    """,
+)
+
+
+def _migration_full_text_search(conn):
+    for statement in CREATE_FTS_SQL:
+        conn.execute(statement)
+    conn.execute("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')")
+
+
+# Posição manual dos cards: rank é uma chave fracionária (ver kanban_rank) e
+# o quadro carrega cada coluna já em ordem pelo índice (coluna, rank). As
+# tarefas existentes recebem ranks na ordem em que eram exibidas.
+MANUAL_ORDER_SQL = (
+    "ALTER TABLE tasks ADD COLUMN rank TEXT",
+    "CREATE INDEX IF NOT EXISTS idx_tasks_coluna_rank ON tasks (coluna, rank)",
+    # A ordem por data de criação deixou de ser usada pelo quadro
+    "DROP INDEX IF EXISTS idx_tasks_criacao",
+    "DROP INDEX IF EXISTS idx_tasks_coluna_criacao",
+)
+
+
+def _migration_manual_order(conn):
+    conn.execute(MANUAL_ORDER_SQL[0])
+    ranks = {}
+    updates = []
+    for task_id, coluna in conn.execute("SELECT id, coluna FROM tasks ORDER BY coluna, data_criacao DESC, id DESC"):
+        if coluna not in ranks:
+            ranks[coluna] = rank_sequence()
+        updates.append((next(ranks[coluna]), task_id))
+    conn.executemany("UPDATE tasks SET rank = ? WHERE id = ?", updates)
+    for statement in MANUAL_ORDER_SQL[1:]:
+        conn.execute(statement)
+
+
+# Arquivamento: concluida_em marca a entrada em "Feito" e tarefas concluídas
+# há mais de N dias saem do quadro para tasks_archive. As concluídas antes
+# desta versão contam a partir da migração.
+ARCHIVE_COLUMNS = (
+    'id', 'titulo', 'descricao', 'coluna', 'data_criacao', 'notificar_em',
+) + NOTIFICATION_COLUMNS + ('rank', 'concluida_em')
+ARCHIVE_SQL = (
+    "ALTER TABLE tasks ADD COLUMN concluida_em DATETIME",
+    "UPDATE tasks SET concluida_em = datetime('now', 'localtime') WHERE coluna = 'done'",
+    "CREATE INDEX IF NOT EXISTS idx_tasks_concluida ON tasks (concluida_em) WHERE coluna = 'done'",
+    """
+    CREATE TABLE IF NOT EXISTS tasks_archive (
+        id INTEGER PRIMARY KEY,
+        titulo TEXT NOT NULL,
+        descricao TEXT,
+        coluna TEXT NOT NULL,
+        data_criacao DATETIME,
+        notificar_em DATETIME,
+        notificado INTEGER NOT NULL DEFAULT 0,
+        notificado_10d INTEGER NOT NULL DEFAULT 0,
+        notificado_5d INTEGER NOT NULL DEFAULT 0,
+        notificado_1d INTEGER NOT NULL DEFAULT 0,
+        rank TEXT,
+        concluida_em DATETIME,
+        arquivada_em DATETIME NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_tasks_archive_concluida ON tasks_archive (concluida_em)",
+)
+
+
+def _migration_archive(conn):
+    for statement in ARCHIVE_SQL:
+        conn.execute(statement)
+
+
+# Log de mudanças: uma linha por tarefa com a sequência da última alteração
+# (inserção, edição ou exclusão), mantida por triggers. Cada instância guarda
+# a última sequência vista e relê só o que mudou depois dela; tarefas
+# excluídas aparecem no log sem linha correspondente em tasks.
+CHANGE_LOG_TRIGGER_BODY = """
+    INSERT INTO tasks_changes (task_id, seq)
+    VALUES ({row}.id, (SELECT coalesce(max(seq), 0) + 1 FROM tasks_changes))
+    ON CONFLICT (task_id) DO UPDATE SET seq = excluded.seq;
+"""
+CHANGE_LOG_INSERT_TRIGGER_SQL = f"""
+    CREATE TRIGGER IF NOT EXISTS tasks_changes_ai AFTER INSERT ON tasks BEGIN
+        {CHANGE_LOG_TRIGGER_BODY.format(row='new')}
+    END
+"""
+CHANGE_LOG_SQL = (
+    """
+    CREATE TABLE IF NOT EXISTS tasks_changes (
+        task_id INTEGER PRIMARY KEY,
+        seq INTEGER NOT NULL
+    )
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_tasks_changes_seq ON tasks_changes (seq)",
+    CHANGE_LOG_INSERT_TRIGGER_SQL,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tasks_changes_au AFTER UPDATE ON tasks BEGIN
+        {CHANGE_LOG_TRIGGER_BODY.format(row='new')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tasks_changes_ad AFTER DELETE ON tasks BEGIN
+        {CHANGE_LOG_TRIGGER_BODY.format(row='old')}
+    END
+    """,
+)
+
+
+def _migration_change_log(conn):
+    for statement in CHANGE_LOG_SQL:
+        conn.execute(statement)
+
+
+# Datas guardadas como segundos desde a época (inteiros) em vez de texto: as
+# consultas comparam inteiros e nada é interpretado de novo ao ler. Cada
+# limiar de aviso ganha uma coluna gerada com o instante em que a sua janela
+# abre, indexada só enquanto o aviso está pendente. O SQLite não muda o tipo
+# nem o padrão de uma coluna existente, então a tabela é recriada com os
+# mesmos ids; índices e gatilhos são refeitos. notificar_em e concluida_em
+# estavam no horário local e data_criacao (CURRENT_TIMESTAMP) em UTC; textos
+# que não são datas viram NULL.
+EPOCH_NOW_SQL = "CAST(strftime('%s', 'now') AS INTEGER)"
+EPOCH_TABLE_SQL = f"""
+CREATE TABLE tasks_new (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    titulo TEXT NOT NULL,
+    descricao TEXT,
+    coluna TEXT NOT NULL DEFAULT 'todo',
+    data_criacao INTEGER DEFAULT ({EPOCH_NOW_SQL}),
+    notificar_em INTEGER,
+    notificado INTEGER NOT NULL DEFAULT 0,
+    notificado_10d INTEGER NOT NULL DEFAULT 0,
+    notificado_5d INTEGER NOT NULL DEFAULT 0,
+    notificado_1d INTEGER NOT NULL DEFAULT 0,
+    rank TEXT,
+    concluida_em INTEGER,
+    aviso_10d_em INTEGER GENERATED ALWAYS AS (notificar_em - {10 * DAY_SECONDS}) VIRTUAL,
+    aviso_5d_em INTEGER GENERATED ALWAYS AS (notificar_em - {5 * DAY_SECONDS}) VIRTUAL,
+    aviso_1d_em INTEGER GENERATED ALWAYS AS (notificar_em - {DAY_SECONDS}) VIRTUAL
+)
+"""
+EPOCH_COPY_SQL = """
+    INSERT INTO tasks_new (
+        id, titulo, descricao, coluna, data_criacao, notificar_em,
+        notificado, notificado_10d, notificado_5d, notificado_1d, rank, concluida_em
+    )
+    SELECT
+        id, titulo, descricao, coluna,
+        CAST(strftime('%s', data_criacao) AS INTEGER),
+        CAST(strftime('%s', notificar_em, 'utc') AS INTEGER),
+        notificado, notificado_10d, notificado_5d, notificado_1d, rank,
+        CAST(strftime('%s', concluida_em, 'utc') AS INTEGER)
+    FROM tasks
+"""
+EPOCH_SQL = (
+    "CREATE INDEX IF NOT EXISTS idx_tasks_coluna_rank ON tasks (coluna, rank)",
+    "CREATE INDEX IF NOT EXISTS idx_tasks_concluida ON tasks (concluida_em) WHERE coluna = 'done'",
+    # Índices parciais: só entram prazos ainda não notificados em cada limiar
+    "CREATE INDEX IF NOT EXISTS idx_tasks_aviso_10d ON tasks (aviso_10d_em) WHERE notificado_10d = 0",
+    "CREATE INDEX IF NOT EXISTS idx_tasks_aviso_5d ON tasks (aviso_5d_em) WHERE notificado_5d = 0",
+    "CREATE INDEX IF NOT EXISTS idx_tasks_aviso_1d ON tasks (aviso_1d_em) WHERE notificado_1d = 0",
+    "CREATE INDEX IF NOT EXISTS idx_tasks_pendente ON tasks (notificar_em) WHERE notificado = 0",
+) + CREATE_FTS_SQL[1:] + CHANGE_LOG_SQL[2:] + (
+    """
+    UPDATE tasks_archive SET
+        data_criacao = CAST(strftime('%s', data_criacao) AS INTEGER),
+        notificar_em = CAST(strftime('%s', notificar_em, 'utc') AS INTEGER),
+        concluida_em = CAST(strftime('%s', concluida_em, 'utc') AS INTEGER),
+        arquivada_em = CAST(strftime('%s', arquivada_em, 'utc') AS INTEGER)
+    """,
+)
+
+
+def _replace_tasks_table(conn, create_sql, copy_sql, params=()):
+    # create_sql cria tasks_new e copy_sql a preenche a partir de tasks. A
+    # sequência do AUTOINCREMENT vai junto: ids de tarefas excluídas ou
+    # arquivadas não podem voltar a ser usados.
+    sequence = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'tasks'").fetchone()
+    conn.execute(create_sql)
+    conn.execute(copy_sql, params)
+    # Os índices e gatilhos de tasks somem com ela e são refeitos por quem
+    # chama; tasks_fts só guarda o nome da tabela de conteúdo e continua
+    # valendo para os mesmos ids
+    conn.execute("DROP TABLE tasks")
+    conn.execute("ALTER TABLE tasks_new RENAME TO tasks")
+    if sequence is not None:
+        conn.execute("DELETE FROM sqlite_sequence WHERE name = 'tasks'")
+        conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('tasks', ?)", (sequence[0],))
+
+
+def _migration_epoch_timestamps(conn):
+    _replace_tasks_table(conn, EPOCH_TABLE_SQL, EPOCH_COPY_SQL)
+    for statement in EPOCH_SQL:
+        conn.execute(statement)
+
+
+# Quadros e colunas definidos pelo usuário. tasks.coluna passa a ser o id
+# (inteiro) de uma linha de columns e cada coluna é lida pelo índice
+# (coluna, rank); o quadro de uma tarefa é o da sua coluna. A chave de uma
+# coluna (única no quadro) é o nome usado na linha de comando e nos arquivos
+# de importação. Entrar numa coluna com conclui = 1 marca a conclusão
+# (concluida_em), papel que antes era só da coluna 'done'. As tarefas
+# existentes vão para um quadro inicial com as três colunas de sempre, mais
+# uma para cada outro valor que estivesse em tasks.coluna.
+BOARDS_SQL = (
+    """
+    CREATE TABLE IF NOT EXISTS boards (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        nome TEXT NOT NULL,
+        rank TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS columns (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        board_id INTEGER NOT NULL REFERENCES boards (id),
+        chave TEXT NOT NULL,
+        nome TEXT NOT NULL,
+        rank TEXT NOT NULL,
+        conclui INTEGER NOT NULL DEFAULT 0,
+        UNIQUE (board_id, chave)
+    )
+    """,
+)
+BOARD_TASKS_TABLE_SQL = f"""
+CREATE TABLE tasks_new (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    titulo TEXT NOT NULL,
+    descricao TEXT,
+    coluna INTEGER NOT NULL REFERENCES columns (id),
+    data_criacao INTEGER DEFAULT ({EPOCH_NOW_SQL}),
+    notificar_em INTEGER,
+    notificado INTEGER NOT NULL DEFAULT 0,
+    notificado_10d INTEGER NOT NULL DEFAULT 0,
+    notificado_5d INTEGER NOT NULL DEFAULT 0,
+    notificado_1d INTEGER NOT NULL DEFAULT 0,
+    rank TEXT,
+    concluida_em INTEGER,
+    aviso_10d_em INTEGER GENERATED ALWAYS AS (notificar_em - {10 * DAY_SECONDS}) VIRTUAL,
+    aviso_5d_em INTEGER GENERATED ALWAYS AS (notificar_em - {5 * DAY_SECONDS}) VIRTUAL,
+    aviso_1d_em INTEGER GENERATED ALWAYS AS (notificar_em - {DAY_SECONDS}) VIRTUAL
+)
+"""
+BOARD_TASKS_COPY_SQL = """
+    INSERT INTO tasks_new (
+        id, titulo, descricao, coluna, data_criacao, notificar_em,
+        notificado, notificado_10d, notificado_5d, notificado_1d, rank, concluida_em
+    )
+    SELECT
+        t.id, t.titulo, t.descricao, c.id, t.data_criacao, t.notificar_em,
+        t.notificado, t.notificado_10d, t.notificado_5d, t.notificado_1d, t.rank, t.concluida_em
+    FROM tasks t JOIN columns c ON c.board_id = ? AND c.chave = t.coluna
+"""
+BOARD_TASKS_SQL = (
+    "CREATE INDEX IF NOT EXISTS idx_tasks_coluna_rank ON tasks (coluna, rank)",
+    # Só tarefas em colunas de conclusão têm concluida_em
+    "CREATE INDEX IF NOT EXISTS idx_tasks_concluida ON tasks (concluida_em) WHERE concluida_em IS NOT NULL",
+) + EPOCH_SQL[2:6] + CREATE_FTS_SQL[1:] + CHANGE_LOG_SQL[2:] + (
+    # O arquivo guarda o id da coluna, como tasks
+    """
+    UPDATE tasks_archive SET coluna = coalesce(
+        (SELECT id FROM columns WHERE board_id = ? AND chave = tasks_archive.coluna), coluna
+    )
+    """,
+)
+
+
+def _insert_board(conn, nome, columns=DEFAULT_COLUMNS):
+    last_rank = conn.execute("SELECT max(rank) FROM boards").fetchone()[0]
+    board_id = conn.execute(
+        "INSERT INTO boards (nome, rank) VALUES (?, ?)", (nome, rank_between(last_rank, None))
+    ).lastrowid
+    for chave, column_nome, conclui in columns:
+        _insert_column(conn, board_id, column_nome, conclui, chave)
+    return board_id
+
+
+def _insert_column(conn, board_id, nome, conclui=0, chave=None):
+    # Colunas novas entram no fim do quadro
+    keys = {row[0] for row in conn.execute("SELECT chave FROM columns WHERE board_id = ?", (board_id,))}
+    last_rank = conn.execute("SELECT max(rank) FROM columns WHERE board_id = ?", (board_id,)).fetchone()[0]
+    return conn.execute(
+        "INSERT INTO columns (board_id, chave, nome, rank, conclui) VALUES (?, ?, ?, ?, ?)",
+        (board_id, chave or column_key(nome, keys), nome, rank_between(last_rank, None), conclui)
+    ).lastrowid
+
+
+def _import_target(conn, quadro, chave):
+    # (id, conclui) da coluna de destino de uma linha importada
+    if quadro:
+        row = conn.execute(SELECT_BOARD_BY_NAME_SQL, (quadro,)).fetchone()
+        board_id = row['id'] if row is not None else _insert_board(conn, quadro)
+    else:
+        board_id = conn.execute(SELECT_BOARDS_SQL).fetchone()['id']
+    if not chave:
+        row = conn.execute(SELECT_COLUMNS_SQL, (board_id,)).fetchone()
+    else:
+        row = conn.execute(SELECT_COLUMN_SQL, (board_id, chave)).fetchone()
+        if row is None:
+            # Fora do formato das chaves ("Em revisão") vale a chave gerada a
+            # partir do texto; a coluna nova leva o texto como nome
+            row = conn.execute(SELECT_COLUMN_SQL, (board_id, column_key(chave))).fetchone()
+        if row is None:
+            return _insert_column(conn, board_id, chave, 0), 0
+    return row['id'], row['conclui']
+
+
+def _migration_boards(conn):
+    for statement in BOARDS_SQL:
+        conn.execute(statement)
+    known = {chave for chave, _, _ in DEFAULT_COLUMNS}
+    others = [row[0] for row in conn.execute("SELECT DISTINCT coluna FROM tasks ORDER BY coluna") if row[0] not in known]
+    board_id = _insert_board(conn, DEFAULT_BOARD_NAME, DEFAULT_COLUMNS + tuple((chave, chave, 0) for chave in others))
+    _replace_tasks_table(conn, BOARD_TASKS_TABLE_SQL, BOARD_TASKS_COPY_SQL, (board_id,))
+    for statement in BOARD_TASKS_SQL[:-1]:
+        conn.execute(statement)
+    conn.execute(BOARD_TASKS_SQL[-1], (board_id,))
+
+
+# Diário de operações para desfazer/refazer. Cada operação gravada pelo
+# usuário ganha uma linha com as imagens inversas (desfazer) e diretas
+# (refazer) das tarefas que mudou: [id, campos] por tarefa, com só os campos
+# alterados, a linha inteira quando a tarefa passa a existir e null quando
+# deixa de existir. Desfazer e refazer só marcam a linha (desfeita); uma
+# operação nova descarta as desfeitas.
+JOURNAL_FIELDS = ARCHIVE_COLUMNS[1:]
+JOURNAL_SQL = (
+    f"""
+    CREATE TABLE IF NOT EXISTS operations (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        tipo TEXT NOT NULL,
+        descricao TEXT NOT NULL,
+        desfazer TEXT NOT NULL,
+        refazer TEXT NOT NULL,
+        desfeita INTEGER NOT NULL DEFAULT 0,
+        criada_em INTEGER NOT NULL DEFAULT ({EPOCH_NOW_SQL})
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_operations_desfeita ON operations (desfeita, id)",
+)
+# Operações seguidas do mesmo tipo sobre as mesmas tarefas (arrastar o mesmo
+# card duas vezes, adiar o prazo duas vezes) viram um único passo
+JOURNAL_MERGE_SECONDS = 10
+JOURNAL_MERGE_TYPES = ('mover', 'adiar', 'editar')
+SELECT_TASK_IMAGES_SQL = f"""
+    SELECT id, {', '.join(JOURNAL_FIELDS)} FROM tasks
+    WHERE id IN (SELECT value FROM json_each(?))
+"""
+SELECT_LAST_OPERATION_SQL = "SELECT * FROM operations WHERE desfeita = 0 ORDER BY id DESC LIMIT 1"
+SELECT_FIRST_UNDONE_OPERATION_SQL = "SELECT * FROM operations WHERE desfeita = 1 ORDER BY id LIMIT 1"
+# Índice das tarefas de cada operação, preenchido junto com ela, para que a
+# compactação ache as operações de uma tarefa sem ler as imagens de todas
+JOURNAL_TASKS_SQL = (
+    """
+    CREATE TABLE IF NOT EXISTS operation_tasks (
+        operation_id INTEGER NOT NULL,
+        task_id INTEGER NOT NULL,
+        PRIMARY KEY (operation_id, task_id)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_operation_tasks_task ON operation_tasks (task_id)",
+    """
+    CREATE TRIGGER IF NOT EXISTS operations_tasks_ad AFTER DELETE ON operations BEGIN
+        DELETE FROM operation_tasks WHERE operation_id = old.id;
+    END
+    """,
+    """
+    INSERT OR IGNORE INTO operation_tasks (operation_id, task_id)
+    SELECT o.id, json_extract(j.value, '$[0]') FROM operations o, json_each(o.desfazer) j
+    """,
+)
+INSERT_OPERATION_TASKS_SQL = """
+    INSERT OR IGNORE INTO operation_tasks (operation_id, task_id)
+    SELECT ?, value FROM json_each(?)
+"""
+# Operações que citam alguma das tarefas (arquivadas, por exemplo)
+SELECT_TASK_OPERATIONS_SQL = """
+    SELECT id, desfazer, refazer FROM operations
+    WHERE id IN (
+        SELECT operation_id FROM operation_tasks
+        WHERE task_id IN (SELECT value FROM json_each(?))
+    )
+"""
+DELETE_OPERATION_TASKS_SQL = """
+    DELETE FROM operation_tasks
+    WHERE operation_id = ? AND task_id IN (SELECT value FROM json_each(?))
+"""
+
+
+def _migration_journal(conn):
+    for statement in JOURNAL_SQL:
+        conn.execute(statement)
+
+
+def _migration_journal_tasks(conn):
+    for statement in JOURNAL_TASKS_SQL:
+        conn.execute(statement)
+
+
+def _dump_images(images):
+    return json.dumps(images, ensure_ascii=False, separators=(',', ':'))
+
+
+def _task_images(conn, task_ids):
+    rows = conn.execute(SELECT_TASK_IMAGES_SQL, (json.dumps(list(task_ids)),))
+    return {row[0]: dict(zip(JOURNAL_FIELDS, tuple(row)[1:])) for row in rows}
+
+
+def _journal_images(before, after, task_ids):
+    # (desfazer, refazer) de cada tarefa que mudou
+    undo = []
+    redo = []
+    for task_id in task_ids:
+        old = before.get(task_id)
+        new = after.get(task_id)
+        if old is None and new is None:
+            continue
+        if old is not None and new is not None:
+            changed = [field for field in JOURNAL_FIELDS if old[field] != new[field]]
+            if not changed:
+                continue
+            old = {field: old[field] for field in changed}
+            new = {field: new[field] for field in changed}
+        undo.append([task_id, old])
+        redo.append([task_id, new])
+    return undo, redo
+
+
+def _merge_images(last, undo, redo):
+    # Junta a operação nova à anterior: desfazer volta ao estado antes da
+    # primeira e refazer leva ao depois da segunda. Sem diferença líquida
+    # (card movido e trazido de volta) não sobra nada.
+    old_undo = dict((task_id, fields) for task_id, fields in json.loads(last['desfazer']))
+    old_redo = dict((task_id, fields) for task_id, fields in json.loads(last['refazer']))
+    merged_undo = []
+    merged_redo = []
+    for (task_id, new_undo), (_, new_redo) in zip(undo, redo):
+        before = dict(new_undo, **old_undo[task_id])
+        after = dict(old_redo[task_id], **new_redo)
+        changed = [field for field in JOURNAL_FIELDS if field in before and before[field] != after[field]]
+        if changed:
+            merged_undo.append([task_id, {field: before[field] for field in changed}])
+            merged_redo.append([task_id, {field: after[field] for field in changed}])
+    return merged_undo, merged_redo
+
+
+def _can_merge(last, tipo, undo):
+    if last is None or tipo not in JOURNAL_MERGE_TYPES or last['tipo'] != tipo:
+        return False
+    if time.time() - last['criada_em'] > JOURNAL_MERGE_SECONDS:
+        return False
+    last_undo = json.loads(last['desfazer'])
+    if any(fields is None for _, fields in last_undo) or any(fields is None for _, fields in undo):
+        return False
+    return sorted(task_id for task_id, _ in last_undo) == sorted(task_id for task_id, _ in undo)
+
+
+def _record_operation(conn, tipo, descricao, task_ids, before):
+    # Chamada dentro da transação da escrita, depois dela: compara as
+    # imagens de antes e de depois e guarda só o que mudou
+    undo, redo = _journal_images(before, _task_images(conn, task_ids), task_ids)
+    if not undo:
+        return
+    conn.execute("DELETE FROM operations WHERE desfeita = 1")
+    last = conn.execute(SELECT_LAST_OPERATION_SQL).fetchone()
+    if _can_merge(last, tipo, undo):
+        undo, redo = _merge_images(last, undo, redo)
+        if not undo:
+            conn.execute("DELETE FROM operations WHERE id = ?", (last['id'],))
+        else:
+            conn.execute(
+                f"UPDATE operations SET descricao = ?, desfazer = ?, refazer = ?, criada_em = {EPOCH_NOW_SQL} WHERE id = ?",
+                (descricao, _dump_images(undo), _dump_images(redo), last['id'])
+            )
+            # Sem diferença líquida uma tarefa sai da operação
+            conn.execute("DELETE FROM operation_tasks WHERE operation_id = ?", (last['id'],))
+            conn.execute(INSERT_OPERATION_TASKS_SQL, (last['id'], json.dumps([task_id for task_id, _ in undo])))
+        return
+    operation_id = conn.execute(
+        "INSERT INTO operations (tipo, descricao, desfazer, refazer) VALUES (?, ?, ?, ?)",
+        (tipo, descricao, _dump_images(undo), _dump_images(redo))
+    ).lastrowid
+    conn.execute(INSERT_OPERATION_TASKS_SQL, (operation_id, json.dumps([task_id for task_id, _ in undo])))
+
+
+def _apply_images(conn, images):
+    for task_id, fields in images:
+        if fields is None:
+            conn.execute(DELETE_TASK_SQL, (task_id,))
+            continue
+        if not set(fields) <= set(JOURNAL_FIELDS):
+            raise ValueError(f"Operação inválida no diário: {sorted(fields)}")
+        if 'coluna' in fields and conn.execute("SELECT 1 FROM columns WHERE id = ?", (fields['coluna'],)).fetchone() is None:
+            raise ValueError("A coluna da tarefa não existe mais.")
+        names = list(fields)
+        values = [fields[name] for name in names]
+        cursor = conn.execute(
+            f"UPDATE tasks SET {', '.join(name + ' = ?' for name in names)} WHERE id = ?", values + [task_id]
+        )
+        # A linha inteira recria a tarefa excluída, com o mesmo id
+        if cursor.rowcount == 0 and len(names) == len(JOURNAL_FIELDS):
+            conn.execute(
+                f"INSERT INTO tasks (id, {', '.join(names)}) VALUES (?, {', '.join('?' for _ in names)})",
+                [task_id] + values
+            )
+
+
+def _forget_tasks(conn, task_ids):
+    # Compactação: tarefas que saíram do quadro para sempre (arquivadas) não
+    # têm mais o que desfazer; as operações perdem as imagens delas
+    forgotten = set(task_ids)
+    payload = json.dumps(task_ids)
+    for row in conn.execute(SELECT_TASK_OPERATIONS_SQL, (payload,)).fetchall():
+        undo = [image for image in json.loads(row['desfazer']) if image[0] not in forgotten]
+        redo = [image for image in json.loads(row['refazer']) if image[0] not in forgotten]
+        if undo:
+            conn.execute(
+                "UPDATE operations SET desfazer = ?, refazer = ? WHERE id = ?",
+                (_dump_images(undo), _dump_images(redo), row['id'])
+            )
+            conn.execute(DELETE_OPERATION_TASKS_SQL, (row['id'], payload))
+        else:
+            conn.execute("DELETE FROM operations WHERE id = ?", (row['id'],))
+
+
+# Resumos para o painel de estatísticas, mantidos por gatilhos a cada
+# mudança: tarefas por coluna, prazos em aberto por semana, conclusões por
+# semana e o histograma do lead time (criação -> conclusão, em dias). Os
+# três últimos são por quadro e os de conclusão somam o arquivo, para que o
+# histórico não se perca ao arquivar. Abrir o painel lê só estas tabelas.
+STATS_WEEK_SECONDS = 7 * DAY_SECONDS
+# Semanas de segunda a domingo, em UTC: o dia 0 da época foi uma quinta
+STATS_WEEK_OFFSET = 4 * DAY_SECONDS
+STATS_TABLES_SQL = (
+    """
+    CREATE TABLE IF NOT EXISTS stats_columns (
+        coluna INTEGER PRIMARY KEY,
+        total INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS stats_deadlines (
+        board_id INTEGER NOT NULL,
+        semana INTEGER NOT NULL,
+        total INTEGER NOT NULL,
+        PRIMARY KEY (board_id, semana)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS stats_completions (
+        board_id INTEGER NOT NULL,
+        semana INTEGER NOT NULL,
+        total INTEGER NOT NULL,
+        PRIMARY KEY (board_id, semana)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS stats_lead_times (
+        board_id INTEGER NOT NULL,
+        dias INTEGER NOT NULL,
+        total INTEGER NOT NULL,
+        PRIMARY KEY (board_id, dias)
+    ) WITHOUT ROWID
+    """,
+    # Prazos em aberto: a contagem de atrasadas da semana corrente é uma faixa neste índice
+    """
+    CREATE INDEX IF NOT EXISTS idx_tasks_prazo_aberto ON tasks (notificar_em)
+    WHERE concluida_em IS NULL AND notificar_em IS NOT NULL
+    """,
+)
+
+
+def _week_sql(value):
+    return f"(({value} - {STATS_WEEK_OFFSET}) / {STATS_WEEK_SECONDS}) * {STATS_WEEK_SECONDS} + {STATS_WEEK_OFFSET}"
+
+
+def _lead_days_sql(row):
+    return f"max(0, ({row}.concluida_em - {row}.data_criacao) / {DAY_SECONDS})"
+
+
+def _stats_keys(row, task_stats=True):
+    # (tabela, [(coluna, expressão)], condição) de cada resumo para a linha row
+    board = f"coalesce((SELECT board_id FROM columns WHERE id = {row}.coluna), 0)"
+    keys = []
+    if task_stats:
+        keys.append(('stats_columns', [('coluna', f"{row}.coluna")], "1"))
+        keys.append((
+            'stats_deadlines', [('board_id', board), ('semana', _week_sql(f"{row}.notificar_em"))],
+            f"{row}.notificar_em IS NOT NULL AND {row}.concluida_em IS NULL"
+        ))
+    keys.append((
+        'stats_completions', [('board_id', board), ('semana', _week_sql(f"{row}.concluida_em"))],
+        f"{row}.concluida_em IS NOT NULL"
+    ))
+    keys.append((
+        'stats_lead_times', [('board_id', board), ('dias', _lead_days_sql(row))],
+        f"{row}.concluida_em IS NOT NULL AND {row}.data_criacao IS NOT NULL"
+    ))
+    return keys
+
+
+def _stats_add_sql(row, task_stats=True):
+    statements = []
+    for table, keys, condition in _stats_keys(row, task_stats):
+        columns = ', '.join(column for column, _ in keys)
+        statements.append(
+            f"INSERT INTO {table} ({columns}, total) SELECT {', '.join(value for _, value in keys)}, 1 "
+            f"WHERE {condition} ON CONFLICT ({columns}) DO UPDATE SET total = total + 1;"
+        )
+    return "\n".join(statements)
+
+
+def _stats_remove_sql(row, task_stats=True):
+    statements = []
+    for table, keys, condition in _stats_keys(row, task_stats):
+        match = ' AND '.join(f"{column} = {value}" for column, value in keys)
+        statements.append(f"UPDATE {table} SET total = total - 1 WHERE {match} AND {condition};")
+    return "\n".join(statements)
+
+
+STATS_INSERT_TRIGGER_SQL = f"""
+    CREATE TRIGGER IF NOT EXISTS tasks_stats_ai AFTER INSERT ON tasks BEGIN
+        {_stats_add_sql('new')}
+    END
+"""
+STATS_TRIGGERS_SQL = (
+    STATS_INSERT_TRIGGER_SQL,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tasks_stats_ad AFTER DELETE ON tasks BEGIN
+        {_stats_remove_sql('old')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tasks_stats_au
+    AFTER UPDATE OF coluna, data_criacao, notificar_em, concluida_em ON tasks BEGIN
+        {_stats_remove_sql('old')}
+        {_stats_add_sql('new')}
+    END
+    """,
+    # Arquivar insere no arquivo e exclui de tasks: as conclusões ficam
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tasks_archive_stats_ai AFTER INSERT ON tasks_archive BEGIN
+        {_stats_add_sql('new', task_stats=False)}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tasks_archive_stats_ad AFTER DELETE ON tasks_archive BEGIN
+        {_stats_remove_sql('old', task_stats=False)}
+    END
+    """,
+)
+STATS_ADD_COLUMNS_SQL = """
+    INSERT INTO stats_columns (coluna, total)
+    SELECT coluna, count(*) FROM tasks WHERE id > ? GROUP BY coluna
+    ON CONFLICT (coluna) DO UPDATE SET total = total + excluded.total
+"""
+STATS_ADD_DEADLINES_SQL = f"""
+    INSERT INTO stats_deadlines (board_id, semana, total)
+    SELECT coalesce(c.board_id, 0), {_week_sql('t.notificar_em')}, count(*)
+    FROM tasks t LEFT JOIN columns c ON c.id = t.coluna
+    WHERE t.id > ? AND t.notificar_em IS NOT NULL AND t.concluida_em IS NULL
+    GROUP BY 1, 2
+    ON CONFLICT (board_id, semana) DO UPDATE SET total = total + excluded.total
+"""
+# Uma única passada agrupada pelas concluídas dá as conclusões por semana e
+# o histograma do lead time
+STATS_COMPLETED_SQL = f"""
+    SELECT coalesce(c.board_id, 0), {_week_sql('t.concluida_em')}, {_lead_days_sql('t')}, count(*)
+    FROM ({{source}}) t LEFT JOIN columns c ON c.id = t.coluna
+    GROUP BY 1, 2, 3
+"""
+STATS_COMPLETED_TASKS_SQL = """
+    SELECT coluna, data_criacao, concluida_em FROM tasks
+    WHERE id > ? AND concluida_em IS NOT NULL
+"""
+STATS_COMPLETED_ARCHIVE_SQL = """
+    SELECT coluna, data_criacao, concluida_em FROM tasks_archive
+    WHERE concluida_em IS NOT NULL
+"""
+
+
+def _add_stats(conn, after_id=0, include_archive=False):
+    # Soma aos resumos as tarefas com id > after_id em passadas agrupadas,
+    # sem um gatilho por linha: usada na reconstrução e na importação
+    conn.execute(STATS_ADD_COLUMNS_SQL, (after_id,))
+    conn.execute(STATS_ADD_DEADLINES_SQL, (after_id,))
+    source = STATS_COMPLETED_TASKS_SQL
+    if include_archive:
+        source += " UNION ALL " + STATS_COMPLETED_ARCHIVE_SQL
+    completions = Counter()
+    lead_times = Counter()
+    for board_id, semana, dias, total in conn.execute(STATS_COMPLETED_SQL.format(source=source), (after_id,)):
+        completions[board_id, semana] += total
+        if dias is not None:
+            lead_times[board_id, dias] += total
+    conn.executemany(
+        "INSERT INTO stats_completions (board_id, semana, total) VALUES (?, ?, ?) "
+        "ON CONFLICT (board_id, semana) DO UPDATE SET total = total + excluded.total",
+        [key + (total,) for key, total in completions.items()]
+    )
+    conn.executemany(
+        "INSERT INTO stats_lead_times (board_id, dias, total) VALUES (?, ?, ?) "
+        "ON CONFLICT (board_id, dias) DO UPDATE SET total = total + excluded.total",
+        [key + (total,) for key, total in lead_times.items()]
+    )
+
+
+def _rebuild_stats(conn):
+    for table in ('stats_columns', 'stats_deadlines', 'stats_completions', 'stats_lead_times'):
+        conn.execute(f"DELETE FROM {table}")
+    _add_stats(conn, include_archive=True)
+
+
+def _migration_stats(conn):
+    for statement in STATS_TABLES_SQL + STATS_TRIGGERS_SQL:
+        conn.execute(statement)
+    _rebuild_stats(conn)
+
+
+# Tarefas concluídas deixam de gerar avisos: os índices parciais dos
+# limiares passam a conter só as não concluídas. Tarefas criadas direto numa
+# coluna de conclusão antes desta versão recebem concluida_em agora.
+COMPLETED_NOTIFICATIONS_SQL = (
+    f"""
+    UPDATE tasks SET concluida_em = {EPOCH_NOW_SQL}
+    WHERE concluida_em IS NULL AND coluna IN (SELECT id FROM columns WHERE conclui)
+    """,
+    "DROP INDEX IF EXISTS idx_tasks_aviso_10d",
+    "DROP INDEX IF EXISTS idx_tasks_aviso_5d",
+    "DROP INDEX IF EXISTS idx_tasks_aviso_1d",
+    "DROP INDEX IF EXISTS idx_tasks_pendente",
+    "CREATE INDEX idx_tasks_aviso_10d ON tasks (aviso_10d_em) WHERE notificado_10d = 0 AND concluida_em IS NULL",
+    "CREATE INDEX idx_tasks_aviso_5d ON tasks (aviso_5d_em) WHERE notificado_5d = 0 AND concluida_em IS NULL",
+    "CREATE INDEX idx_tasks_aviso_1d ON tasks (aviso_1d_em) WHERE notificado_1d = 0 AND concluida_em IS NULL",
+    "CREATE INDEX idx_tasks_pendente ON tasks (notificar_em) WHERE notificado = 0 AND concluida_em IS NULL",
+)
+
+
+def _migration_completed_notifications(conn):
+    for statement in COMPLETED_NOTIFICATIONS_SQL:
+        conn.execute(statement)
+
+
+# A posição na tupla define a versão gravada em PRAGMA user_version.
+# Novas mudanças de schema entram sempre no final; nunca altere as anteriores.
+MIGRATIONS = (
+    _migration_create_tasks,
+    _migration_indexes,
+    _migration_full_text_search,
+    _migration_manual_order,
+    _migration_archive,
+    _migration_change_log,
+    _migration_epoch_timestamps,
+    _migration_boards,
+    _migration_journal,
+    _migration_stats,
+    _migration_completed_notifications,
+    _migration_journal_tasks,
+)
+
+SELECT_TASK_SQL = "SELECT * FROM tasks WHERE id = ?"
+SELECT_TASKS_SQL = """
+    SELECT t.* FROM tasks t JOIN columns c ON c.id = t.coluna
+    WHERE c.board_id = ?
+    ORDER BY c.rank, t.rank, t.id
+"""
+SELECT_COLUMN_TASKS_SQL = "SELECT * FROM tasks WHERE coluna = ? ORDER BY rank, id"
+SELECT_BOARDS_SQL = "SELECT id, nome FROM boards ORDER BY rank, id"
+SELECT_BOARD_SQL = "SELECT id, nome FROM boards WHERE id = ?"
+SELECT_BOARD_BY_NAME_SQL = "SELECT id, nome FROM boards WHERE nome = ? ORDER BY rank, id LIMIT 1"
+SELECT_COLUMNS_SQL = "SELECT id, board_id, chave, nome, conclui FROM columns WHERE board_id = ? ORDER BY rank, id"
+SELECT_COLUMN_SQL = "SELECT id, board_id, chave, nome, conclui FROM columns WHERE board_id = ? AND chave = ?"
+# Prazos até a data limite (inclusive os vencidos) de tarefas ainda não concluídas
+SELECT_DUE_TASKS_SQL = """
+    SELECT * FROM tasks
+    WHERE notificar_em IS NOT NULL
+      AND notificar_em <= ?
+      AND concluida_em IS NULL
+    ORDER BY notificar_em, id
+"""
+# Criar direto numa coluna de conclusão já marca a conclusão, como em MOVE_TASK_SQL
+INSERT_TASK_SQL = f"""
+    INSERT INTO tasks (titulo, descricao, notificar_em, coluna, rank, concluida_em)
+    VALUES (?1, ?2, ?3, ?4, ?5, CASE WHEN (SELECT conclui FROM columns WHERE id = ?4) THEN {EPOCH_NOW_SQL} END)
+"""
+# Tarefas novas entram no topo da coluna
+FIRST_RANK_SQL = "SELECT min(rank) FROM tasks WHERE coluna = ?"
+LAST_RANKS_SQL = "SELECT coluna, max(rank) FROM tasks GROUP BY coluna"
+UPDATE_TASK_SQL = """
+    UPDATE tasks SET
+        titulo = ?,
+        descricao = ?,
+        notificar_em = ?,
+        notificado = 0,
+        notificado_10d = 0,
+        notificado_5d = 0,
+        notificado_1d = 0
+    WHERE id = ?
+"""
+# Tarefas concluídas não geram avisos
+SELECT_PENDING_DEADLINES_SQL = """
+    SELECT id, notificar_em, notificado, notificado_10d, notificado_5d, notificado_1d
+    FROM tasks
+    WHERE notificar_em IS NOT NULL AND notificado = 0 AND concluida_em IS NULL
+"""
+# Uma única leitura classifica cada tarefa vencida no seu limiar. Cada parte
+# é uma faixa de inteiros no índice parcial da coluna gerada do limiar: a
+# janela abriu (aviso_*_em <= agora) e a do limiar seguinte ainda não.
+SELECT_DUE_NOTIFICATIONS_SQL = """
+    SELECT id, titulo, 'notificado_10d' AS flag FROM tasks
+    WHERE notificado_10d = 0 AND concluida_em IS NULL AND aviso_10d_em <= :agora AND aviso_5d_em > :agora
+    UNION ALL
+    SELECT id, titulo, 'notificado_5d' AS flag FROM tasks
+    WHERE notificado_5d = 0 AND concluida_em IS NULL AND aviso_5d_em <= :agora AND aviso_1d_em > :agora
+    UNION ALL
+    SELECT id, titulo, 'notificado_1d' AS flag FROM tasks
+    WHERE notificado_1d = 0 AND concluida_em IS NULL AND aviso_1d_em <= :agora AND notificar_em > :agora
+    UNION ALL
+    SELECT id, titulo, 'notificado' AS flag FROM tasks
+    WHERE notificado = 0 AND concluida_em IS NULL AND notificar_em <= :agora
+"""
+# Título pesa mais que a descrição no ranking bm25 (menor = mais relevante)
+SEARCH_TASKS_SQL = """
+    SELECT rowid FROM tasks_fts
+    WHERE tasks_fts MATCH ?
+    ORDER BY bm25(tasks_fts, 10.0, 1.0)
+    LIMIT ?
+"""
+# Só os resultados de um quadro, para que os de outros não ocupem o limite
+SEARCH_BOARD_TASKS_SQL = """
+    SELECT f.rowid FROM tasks_fts f
+    JOIN tasks t ON t.id = f.rowid
+    JOIN columns c ON c.id = t.coluna
+    WHERE tasks_fts MATCH ? AND c.board_id = ?
+    ORDER BY bm25(tasks_fts, 10.0, 1.0)
+    LIMIT ?
+"""
+SEARCH_LIMIT = 1000
+# Entrar numa coluna de conclusão marca a conclusão (mover entre colunas de
+# conclusão mantém a data); ir para outra coluna a desfaz
+MOVE_TASK_SQL = f"""
+    UPDATE tasks SET
+        coluna = ?1,
+        rank = ?2,
+        concluida_em = CASE
+            WHEN NOT (SELECT conclui FROM columns WHERE id = ?1) THEN NULL
+            WHEN concluida_em IS NOT NULL THEN concluida_em
+            ELSE {EPOCH_NOW_SQL}
+        END
+    WHERE id = ?3
+"""
+DELETE_TASK_SQL = "DELETE FROM tasks WHERE id = ?"
+# Adiar o prazo reabre os avisos, como numa edição
+SHIFT_DEADLINE_SQL = """
+    UPDATE tasks SET
+        notificar_em = notificar_em + ?,
+        notificado = 0,
+        notificado_10d = 0,
+        notificado_5d = 0,
+        notificado_1d = 0
+    WHERE id = ? AND notificar_em IS NOT NULL
+"""
+# Sem estatísticas o planejador prefere (coluna, rank), que percorre a coluna
+# inteira; o índice parcial vai direto às concluídas mais antigas
+SELECT_ARCHIVABLE_SQL = """
+    SELECT id FROM tasks INDEXED BY idx_tasks_concluida
+    WHERE concluida_em IS NOT NULL AND concluida_em <= ?
+    LIMIT ?
+"""
+ARCHIVE_TASKS_SQL = f"""
+    INSERT INTO tasks_archive ({', '.join(ARCHIVE_COLUMNS)}, arquivada_em)
+    SELECT {', '.join(ARCHIVE_COLUMNS)}, {EPOCH_NOW_SQL} FROM tasks
+    WHERE id IN (SELECT value FROM json_each(?))
+"""
+DELETE_TASKS_IN_SQL = "DELETE FROM tasks WHERE id IN (SELECT value FROM json_each(?))"
+ARCHIVE_BATCH_SIZE = 500
+CHANGE_SEQUENCE_SQL = "SELECT coalesce(max(seq), 0) FROM tasks_changes"
+# Na importação o log recebe as linhas novas de uma vez, como o FTS
+BULK_LOG_CHANGES_SQL = """
+    INSERT INTO tasks_changes (task_id, seq)
+    SELECT id, ? + row_number() OVER (ORDER BY id) FROM tasks WHERE id > ?
+"""
+# Painel de estatísticas: só leituras dos resumos, pela chave primária
+STATS_COLUMNS_SQL = """
+    SELECT c.id, c.nome, c.conclui, coalesce(s.total, 0) AS total
+    FROM columns c LEFT JOIN stats_columns s ON s.coluna = c.id
+    WHERE c.board_id = ?
+    ORDER BY c.rank, c.id
+"""
+STATS_OVERDUE_WEEKS_SQL = "SELECT coalesce(sum(total), 0) FROM stats_deadlines WHERE board_id = ? AND semana < ?"
+# Na semana corrente, só os prazos já vencidos: uma faixa de no máximo uma semana no índice
+STATS_OVERDUE_CURRENT_SQL = """
+    SELECT count(*) FROM tasks t INDEXED BY idx_tasks_prazo_aberto
+    JOIN columns c ON c.id = t.coluna
+    WHERE t.notificar_em IS NOT NULL AND t.concluida_em IS NULL
+      AND t.notificar_em >= ? AND t.notificar_em <= ? AND c.board_id = ?
+"""
+STATS_WEEKS_SQL = """
+    SELECT semana, total FROM {table}
+    WHERE board_id = ? AND semana >= ? AND semana < ? AND total > 0
+    ORDER BY semana
+"""
+STATS_LEAD_TIMES_SQL = "SELECT dias, total FROM stats_lead_times WHERE board_id = ? AND total > 0 ORDER BY dias"
+STATS_WEEKS = 8
+BULK_INDEX_FTS_SQL = """
+    INSERT INTO tasks_fts (rowid, titulo, descricao)
+    SELECT id, titulo, descricao FROM tasks WHERE id > ?
+"""
+
+
+def default_db_path():
+    override = os.environ.get(DB_FILE_ENV)
+    if override:
+        return override
+    
+    base_dir = os.environ.get('APPDATA') or os.path.expanduser("~")
+    app_data_dir = os.path.join(base_dir, APP_NAME)
+    os.makedirs(app_data_dir, exist_ok=True)
+    return os.path.join(app_data_dir, DB_FILE_NAME)
+
+
+def format_datetime(value):
+    return value.strftime(DATETIME_FORMAT)
+
+
+def to_epoch(value):
+    # datetime sem fuso é interpretado no horário local, como o prazo digitado
+    return int(value.timestamp()) if value is not None else None
+
+
+def from_epoch(value):
+    return datetime.fromtimestamp(value) if value is not None else None
+
+
+def parse_datetime(value):
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value
+    try:
+        # Só para texto vindo de fora (arquivos importados, linha de comando); o
+        # banco guarda inteiros. fromisoformat (em C) é bem mais rápido que strptime
+        return datetime.fromisoformat(value.split('.')[0])
+    except ValueError:
+        return None
+
+
+def column_key(nome, existing=()):
+    # Chave da coluna a partir do nome: minúsculas, sem acentos e sem
+    # espaços ("Em revisão" -> "em-revisao"), única entre as do quadro
+    base = unicodedata.normalize('NFKD', nome).encode('ascii', 'ignore').decode('ascii').lower()
+    base = re.sub(r"[^a-z0-9]+", "-", base).strip("-") or "coluna"
+    key = base
+    suffix = 2
+    while key in existing:
+        key = f"{base}-{suffix}"
+        suffix += 1
+    return key
+
+
+def fts_query(text):
+    # Cada palavra digitada vira um termo de prefixo entre aspas, o que também
+    # neutraliza a sintaxe do FTS5 (operadores, aspas, parênteses).
+    return " ".join(f'"{term}"*' for term in re.findall(r"\w+", text))
+
+
+class Database:
+    # Uma conexão persistente por thread: a thread da interface reaproveita
+    # sempre a mesma e threads de fundo recebem a sua na primeira chamada.
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.path,
+                cached_statements=STATEMENT_CACHE_SIZE,
+                check_same_thread=False
+            )
+            conn.row_factory = sqlite3.Row
+            for pragma in CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                # Mantém as estatísticas do planejador atualizadas para os índices
+                conn.execute("PRAGMA optimize")
+                conn.close()
+            except sqlite3.Error as e:
+                print(f"Erro ao fechar conexão SQLite: {e}", file=sys.stderr)
+        self._local = threading.local()
+
+    def init_schema(self):
+        conn = self.connection()
+        # Banco em dia: só uma leitura, sem disputar a trava de escrita com
+        # outra conexão que esteja gravando (importação, arquivamento)
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version == len(MIGRATIONS):
+            return version
+        while True:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                # Outra conexão pode ter migrado enquanto esta esperava a trava
+                version = conn.execute("PRAGMA user_version").fetchone()[0]
+                if version > len(MIGRATIONS):
+                    raise sqlite3.DatabaseError(
+                        f"Versão do banco ({version}) é mais nova que a do aplicativo ({len(MIGRATIONS)})."
+                    )
+                if version == len(MIGRATIONS):
+                    return version
+                
+                MIGRATIONS[version](conn)
+                conn.execute(f"PRAGMA user_version = {version + 1}")
+            # Em stderr: a saída padrão da linha de comando é só o resultado
+            print(f"Banco de dados migrado para a versão {version + 1}.", file=sys.stderr)
+
+    def get_task(self, task_id):
+        return self.connection().execute(SELECT_TASK_SQL, (task_id,)).fetchone()
+
+    def list_tasks(self, board_id):
+        return self.connection().execute(SELECT_TASKS_SQL, (board_id,)).fetchall()
+
+    def list_column_tasks(self, coluna):
+        return self.connection().execute(SELECT_COLUMN_TASKS_SQL, (coluna,)).fetchall()
+
+    def list_boards(self):
+        return self.connection().execute(SELECT_BOARDS_SQL).fetchall()
+
+    def get_board(self, board_id):
+        if board_id is None:
+            # O primeiro quadro é o padrão
+            return self.connection().execute(SELECT_BOARDS_SQL).fetchone()
+        return self.connection().execute(SELECT_BOARD_SQL, (board_id,)).fetchone()
+
+    def find_board(self, name_or_id):
+        # Pelo nome ou, se for um número, pelo id
+        row = self.connection().execute(SELECT_BOARD_BY_NAME_SQL, (name_or_id,)).fetchone()
+        if row is None and str(name_or_id).isdigit():
+            row = self.get_board(int(name_or_id))
+        return row
+
+    def list_columns(self, board_id):
+        return self.connection().execute(SELECT_COLUMNS_SQL, (board_id,)).fetchall()
+
+    def find_column(self, board_id, chave):
+        return self.connection().execute(SELECT_COLUMN_SQL, (board_id, chave)).fetchone()
+
+    def create_board(self, nome):
+        conn = self.connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            board_id = _insert_board(conn, nome)
+        return self.get_board(board_id)
+
+    def rename_board(self, board_id, nome):
+        conn = self.connection()
+        with conn:
+            conn.execute("UPDATE boards SET nome = ? WHERE id = ?", (nome, board_id))
+
+    def create_column(self, board_id, nome, conclui=0):
+        conn = self.connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            return _insert_column(conn, board_id, nome, conclui)
+
+    def rename_column(self, column_id, nome):
+        # A chave não muda: scripts e arquivos continuam valendo
+        conn = self.connection()
+        with conn:
+            conn.execute("UPDATE columns SET nome = ? WHERE id = ?", (nome, column_id))
+
+    def delete_column(self, column_id):
+        conn = self.connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("SELECT 1 FROM tasks WHERE coluna = ? LIMIT 1", (column_id,)).fetchone():
+                raise ValueError("Só é possível excluir uma coluna vazia.")
+            # O arquivo guarda o id da coluna: sem ela as conclusões arquivadas
+            # perderiam o quadro (e as estatísticas dele)
+            if conn.execute("SELECT 1 FROM tasks_archive WHERE coluna = ? LIMIT 1", (column_id,)).fetchone():
+                raise ValueError("A coluna tem tarefas arquivadas e não pode ser excluída.")
+            remaining = conn.execute(
+                "SELECT count(*) FROM columns WHERE board_id = (SELECT board_id FROM columns WHERE id = ?)",
+                (column_id,)
+            ).fetchone()[0]
+            if remaining <= 1:
+                raise ValueError("O quadro precisa de pelo menos uma coluna.")
+            conn.execute("DELETE FROM columns WHERE id = ?", (column_id,))
+
+    def list_due_tasks(self, within):
+        limit = int(time.time() + within.total_seconds())
+        return self.connection().execute(SELECT_DUE_TASKS_SQL, (limit,)).fetchall()
+
+    def insert_task(self, titulo, descricao, notificar_em, coluna):
+        return self.get_task(self.insert_tasks([titulo], descricao, notificar_em, coluna)[0])
+
+    def insert_tasks(self, titulos, descricao, notificar_em, coluna):
+        # Um lote entra numa única transação e num único passo do diário, no
+        # topo da coluna e na ordem dada. Devolve os ids.
+        if not titulos:
+            return []
+        conn = self.connection()
+        with conn:
+            # IMMEDIATE: o rank lido e a inserção ficam na mesma trava de escrita
+            conn.execute("BEGIN IMMEDIATE")
+            first_rank = conn.execute(FIRST_RANK_SQL, (coluna,)).fetchone()[0]
+            task_ids = [
+                conn.execute(INSERT_TASK_SQL, (titulo, descricao, to_epoch(notificar_em), coluna, rank)).lastrowid
+                for titulo, rank in zip(titulos, ranks_between(None, first_rank, len(titulos)))
+            ]
+            descricao_operacao = "Criar tarefa" if len(task_ids) == 1 else f"Criar {len(task_ids)} tarefa(s)"
+            _record_operation(conn, 'criar', descricao_operacao, task_ids, {})
+        return task_ids
+
+    def update_task(self, task_id, titulo, descricao, notificar_em):
+        self._write_journaled(
+            'editar', "Editar tarefa", [task_id],
+            UPDATE_TASK_SQL, [(titulo, descricao, to_epoch(notificar_em), task_id)]
+        )
+        return self.get_task(task_id)
+
+    def _write_journaled(self, tipo, descricao, task_ids, sql, params):
+        # A escrita e a linha do diário saem na mesma transação
+        conn = self.connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            before = _task_images(conn, task_ids)
+            cursor = conn.executemany(sql, params)
+            _record_operation(conn, tipo, descricao, task_ids, before)
+        return cursor.rowcount
+
+    def undo(self):
+        # (descrição, ids das tarefas afetadas) ou None se não há o que desfazer
+        return self._replay(SELECT_LAST_OPERATION_SQL, 'desfazer', 1)
+
+    def redo(self):
+        return self._replay(SELECT_FIRST_UNDONE_OPERATION_SQL, 'refazer', 0)
+
+    def _replay(self, select_sql, images_column, desfeita):
+        conn = self.connection()
+        try:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                operation = conn.execute(select_sql).fetchone()
+                if operation is None:
+                    return None
+                images = json.loads(operation[images_column])
+                _apply_images(conn, images)
+                conn.execute("UPDATE operations SET desfeita = ? WHERE id = ?", (desfeita, operation['id']))
+        except ValueError as e:
+            # Uma operação que não se aplica mais sai do diário, para não travar a pilha
+            with conn:
+                conn.execute("DELETE FROM operations WHERE id = ?", (operation['id'],))
+            raise ValueError(f"{e} A operação '{operation['descricao']}' foi descartada.")
+        return operation['descricao'], [task_id for task_id, _ in images]
+
+    def data_version(self):
+        # Muda quando outra conexão (outra instância, um script) grava no
+        # banco; as gravações feitas por esta mesma conexão não contam
+        return self.connection().execute("PRAGMA data_version").fetchone()[0]
+
+    def change_sequence(self):
+        return self.connection().execute(CHANGE_SEQUENCE_SQL).fetchone()[0]
+
+    def list_pending_deadlines(self):
+        return self.connection().execute(SELECT_PENDING_DEADLINES_SQL).fetchall()
+
+    def search_tasks(self, text, board_id=None, limit=SEARCH_LIMIT):
+        query = fts_query(text)
+        if not query:
+            return []
+        if board_id is None:
+            return [row[0] for row in self.connection().execute(SEARCH_TASKS_SQL, (query, limit))]
+        return [row[0] for row in self.connection().execute(SEARCH_BOARD_TASKS_SQL, (query, board_id, limit))]
+
+    def move_task(self, task_id, coluna, rank):
+        # Só a linha movida muda: o rank novo fica entre os dos vizinhos
+        self._write_journaled('mover', "Mover tarefa", [task_id], MOVE_TASK_SQL, [(coluna, rank, task_id)])
+
+    def move_tasks_to_top(self, task_ids, coluna):
+        # Sem vizinhos escolhidos na tela: os cards vão para o topo da coluna,
+        # na ordem dada
+        conn = self.connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            before = _task_images(conn, task_ids)
+            first_rank = conn.execute(FIRST_RANK_SQL, (coluna,)).fetchone()[0]
+            ranks = ranks_between(None, first_rank, len(task_ids))
+            cursor = conn.executemany(MOVE_TASK_SQL, [(coluna, rank, task_id) for task_id, rank in zip(task_ids, ranks)])
+            _record_operation(conn, 'mover', f"Mover {len(task_ids)} tarefa(s)", task_ids, before)
+        return cursor.rowcount
+
+    def delete_task(self, task_id):
+        self._write_journaled('excluir', "Excluir tarefa", [task_id], DELETE_TASK_SQL, [(task_id,)])
+
+    def move_tasks(self, task_ids, coluna, ranks):
+        self._write_journaled(
+            'mover', f"Mover {len(task_ids)} tarefa(s)", task_ids,
+            MOVE_TASK_SQL, [(coluna, rank, task_id) for task_id, rank in zip(task_ids, ranks)]
+        )
+
+    def delete_tasks(self, task_ids):
+        self._write_journaled(
+            'excluir', f"Excluir {len(task_ids)} tarefa(s)", task_ids,
+            DELETE_TASK_SQL, [(task_id,) for task_id in task_ids]
+        )
+
+    def shift_deadlines(self, task_ids, delta):
+        seconds = int(delta.total_seconds())
+        self._write_journaled(
+            'adiar', f"Adiar prazo de {len(task_ids)} tarefa(s)", task_ids,
+            SHIFT_DEADLINE_SQL, [(seconds, task_id) for task_id in task_ids]
+        )
+
+    def board_stats(self, board_id, now=None):
+        # Tudo sai das tabelas de resumo: o custo não depende do histórico
+        now = int(time.time()) if now is None else int(now)
+        week = now - (now - STATS_WEEK_OFFSET) % STATS_WEEK_SECONDS
+        conn = self.connection()
+        with conn:
+            conn.execute("BEGIN")
+            overdue = conn.execute(STATS_OVERDUE_WEEKS_SQL, (board_id, week)).fetchone()[0]
+            overdue += conn.execute(STATS_OVERDUE_CURRENT_SQL, (week, now, board_id)).fetchone()[0]
+            return {
+                'colunas': [dict(row) for row in conn.execute(STATS_COLUMNS_SQL, (board_id,))],
+                'atrasadas': overdue,
+                'semana': week,
+                'prazos': conn.execute(
+                    STATS_WEEKS_SQL.format(table='stats_deadlines'),
+                    (board_id, week, week + STATS_WEEKS * STATS_WEEK_SECONDS)
+                ).fetchall(),
+                'conclusoes': conn.execute(
+                    STATS_WEEKS_SQL.format(table='stats_completions'),
+                    (board_id, week - (STATS_WEEKS - 1) * STATS_WEEK_SECONDS, week + STATS_WEEK_SECONDS)
+                ).fetchall(),
+                'lead_times': conn.execute(STATS_LEAD_TIMES_SQL, (board_id,)).fetchall(),
+            }
+
+    def rebuild_stats(self):
+        conn = self.connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            _rebuild_stats(conn)
+
+    def archive_done_tasks(self, older_than_days, batch_size=ARCHIVE_BATCH_SIZE):
+        # Um lote por transação, para não segurar a trava de escrita enquanto
+        # um histórico grande é arquivado. Devolve os ids que saíram do quadro.
+        cutoff = int(time.time()) - int(older_than_days) * DAY_SECONDS
+        archived = []
+        conn = self.connection()
+        while True:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                ids = [row[0] for row in conn.execute(SELECT_ARCHIVABLE_SQL, (cutoff, batch_size))]
+                if ids:
+                    payload = json.dumps(ids)
+                    conn.execute(ARCHIVE_TASKS_SQL, (payload,))
+                    conn.execute(DELETE_TASKS_IN_SQL, (payload,))
+                    _forget_tasks(conn, ids)
+            archived.extend(ids)
+            if len(ids) < batch_size:
+                return archived
+
+    def due_notifications(self):
+        return self.connection().execute(SELECT_DUE_NOTIFICATIONS_SQL, {'agora': int(time.time())}).fetchall()
+
+    def claim_due_notifications(self):
+        due = self.due_notifications()
+        if due:
+            self.mark_notified_many((tarefa['id'], tarefa['flag']) for tarefa in due)
+        return due
+
+    def mark_notified_many(self, notifications):
+        ids_by_flag = {}
+        for task_id, column_name in notifications:
+            if column_name not in NOTIFICATION_COLUMNS:
+                raise ValueError(f"Coluna de notificação inválida: {column_name}")
+            ids_by_flag.setdefault(column_name, []).append((task_id,))
+        
+        conn = self.connection()
+        with conn:
+            for column_name, ids in ids_by_flag.items():
+                conn.executemany(f"UPDATE tasks SET {column_name} = 1 WHERE id = ?", ids)
+
+    def bulk_insert_tasks(self, columns, chunks, progress=None):
+        # Tudo numa única transação. Os gatilhos do FTS e do log de mudanças
+        # são desligados durante a carga e as linhas novas entram em cada um
+        # num único INSERT ... SELECT no final, bem mais barato que um por
+        # linha. As tarefas entram no fim de cada coluna, na ordem em que chegam.
+        # Cada linha traz o quadro (nome) e a coluna (chave) em texto; os que
+        # ainda não existem são criados e sem quadro vale o padrão. concluida_em
+        # só fica nas colunas de conclusão e, se vier vazia, vale o agora.
+        columns = tuple(columns)
+        board_index = columns.index('quadro')
+        coluna_index = columns.index('coluna')
+        concluida_index = columns.index('concluida_em')
+        insert_columns = tuple(column for column in columns if column != 'quadro') + ('rank',)
+        sql = f"INSERT INTO tasks ({', '.join(insert_columns)}) VALUES ({', '.join('?' for _ in insert_columns)})"
+        now = int(time.time())
+        targets = {}
+        count = 0
+        conn = self.connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            last_id = conn.execute("SELECT coalesce(max(id), 0) FROM tasks").fetchone()[0]
+            last_change = conn.execute(CHANGE_SEQUENCE_SQL).fetchone()[0]
+            ranks = {coluna: rank_sequence(last_rank) for coluna, last_rank in conn.execute(LAST_RANKS_SQL)}
+            conn.execute("DROP TRIGGER IF EXISTS tasks_fts_ai")
+            conn.execute("DROP TRIGGER IF EXISTS tasks_changes_ai")
+            conn.execute("DROP TRIGGER IF EXISTS tasks_stats_ai")
+            for chunk in chunks:
+                rows = []
+                for row in chunk:
+                    key = (row[board_index], row[coluna_index])
+                    target = targets.get(key)
+                    if target is None:
+                        target = targets[key] = _import_target(conn, *key)
+                    coluna, conclui = target
+                    sequence = ranks.get(coluna)
+                    if sequence is None:
+                        sequence = ranks[coluna] = rank_sequence()
+                    values = list(row)
+                    values[coluna_index] = coluna
+                    values[concluida_index] = (values[concluida_index] or now) if conclui else None
+                    del values[board_index]
+                    rows.append(tuple(values) + (next(sequence),))
+                conn.executemany(sql, rows)
+                count += len(chunk)
+                if progress is not None:
+                    progress(count)
+            conn.execute(BULK_INDEX_FTS_SQL, (last_id,))
+            conn.execute(BULK_LOG_CHANGES_SQL, (last_change, last_id))
+            _add_stats(conn, last_id)
+            conn.execute(FTS_INSERT_TRIGGER_SQL)
+            conn.execute(CHANGE_LOG_INSERT_TRIGGER_SQL)
+            conn.execute(STATS_INSERT_TRIGGER_SQL)
+        return count
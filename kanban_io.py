@@ -0,0 +1,156 @@
+import csv
+import json
+import os
+import time
+from calendar import timegm
+from itertools import islice
+
+from kanban_db import parse_datetime, to_epoch
+
+TASK_COLUMNS = (
+    'id', 'titulo', 'descricao', 'coluna', 'data_criacao', 'notificar_em',
+    'notificado', 'notificado_10d', 'notificado_5d', 'notificado_1d', 'rank', 'concluida_em', 'quadro',
+)
+# Na importação o id e o rank do arquivo são ignorados: as tarefas sempre
+# recebem ids novos e entram no fim da coluna, na ordem do arquivo. O quadro
+# vai pelo nome e a coluna pela chave; os que faltarem são criados.
+IMPORT_COLUMNS = ('quadro',) + TASK_COLUMNS[1:-3] + ('concluida_em',)
+CHUNK_SIZE = 5000
+FLAG_VALUES = {'0': 0, '1': 1, '': 0, None: 0, 0: 0, 1: 1}
+
+FORMATS_BY_EXTENSION = {
+    '.csv': 'csv',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+}
+
+# Nos arquivos as datas continuam em texto, como antes da migração para
+# inteiros: data_criacao e concluida_em em UTC e o prazo no horário local. A
+# conversão é feita pelo próprio SQLite na leitura.
+EXPORT_EXPRESSIONS = {
+    'data_criacao': "strftime('%Y-%m-%d %H:%M:%S', t.data_criacao, 'unixepoch')",
+    'concluida_em': "strftime('%Y-%m-%d %H:%M:%S', t.concluida_em, 'unixepoch')",
+    'notificar_em': "strftime('%Y-%m-%d %H:%M:%S', t.notificar_em, 'unixepoch', 'localtime')",
+    'coluna': "c.chave",
+    'quadro': "b.nome",
+}
+# Na ordem dos quadros, para que reimportar o arquivo preserve a ordem dos cards
+EXPORT_TASKS_SQL = f"""
+    SELECT {', '.join(EXPORT_EXPRESSIONS.get(column, 't.' + column) for column in TASK_COLUMNS)}
+    FROM tasks t
+    JOIN columns c ON c.id = t.coluna
+    JOIN boards b ON b.id = c.board_id
+    ORDER BY b.rank, b.id, c.rank, c.id, t.rank, t.id
+"""
+
+
+def detect_format(path, fmt=None):
+    if fmt:
+        if fmt not in ('csv', 'jsonl'):
+            raise ValueError(f"Formato desconhecido: {fmt}")
+        return fmt
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS_BY_EXTENSION:
+        raise ValueError(f"Não foi possível deduzir o formato de '{path}' (use .csv ou .jsonl)")
+    return FORMATS_BY_EXTENSION[extension]
+
+
+def chunked(iterable, size=CHUNK_SIZE):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_task_rows(db, chunk_size=CHUNK_SIZE):
+    cursor = db.connection().execute(EXPORT_TASKS_SQL)
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            return
+        yield from rows
+
+
+def export_tasks(db, path, fmt=None):
+    fmt = detect_format(path, fmt)
+    count = 0
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        if fmt == 'csv':
+            writer = csv.writer(f)
+            writer.writerow(TASK_COLUMNS)
+            for row in iter_task_rows(db):
+                writer.writerow(tuple(row))
+                count += 1
+        else:
+            for row in iter_task_rows(db):
+                f.write(json.dumps(dict(zip(TASK_COLUMNS, row)), ensure_ascii=False) + "\n")
+                count += 1
+    return count
+
+
+def read_task_records(path, fmt=None):
+    fmt = detect_format(path, fmt)
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        if fmt == 'csv':
+            # A linha 1 é o cabeçalho
+            for line_number, record in enumerate(csv.DictReader(f), start=2):
+                yield line_number, record
+        else:
+            for line_number, line in enumerate(f, start=1):
+                if line.strip():
+                    try:
+                        yield line_number, json.loads(line)
+                    except json.JSONDecodeError as e:
+                        raise ValueError(f"Linha {line_number}: JSON inválido ({e.msg})")
+
+
+def _to_epoch(value, line_number, column, utc=False):
+    if value in (None, ''):
+        return None
+    # Inteiros (segundos desde a época) entram como estão
+    if isinstance(value, int):
+        return value
+    value = str(value)
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValueError(f"Linha {line_number}: data inválida em '{column}': {value!r}")
+    return timegm(parsed.timetuple()) if utc else to_epoch(parsed)
+
+
+def _to_flag(value):
+    # '0'/'1' (exportação em CSV) e inteiros (JSON Lines) são os casos comuns
+    if value in FLAG_VALUES:
+        return FLAG_VALUES[value]
+    if isinstance(value, str):
+        return 1 if value.strip().lower() in ('1', 'true', 'sim', 'yes') else 0
+    return 1 if value else 0
+
+
+def task_values(record, line_number):
+    titulo = (record.get('titulo') or '').strip()
+    if not titulo:
+        raise ValueError(f"Linha {line_number}: 'titulo' é obrigatório")
+
+    data_criacao = _to_epoch(record.get('data_criacao'), line_number, 'data_criacao', utc=True)
+    return (
+        record.get('quadro') or None,
+        titulo,
+        record.get('descricao') or None,
+        record.get('coluna') or None,
+        int(time.time()) if data_criacao is None else data_criacao,
+        _to_epoch(record.get('notificar_em'), line_number, 'notificar_em'),
+        _to_flag(record.get('notificado')),
+        _to_flag(record.get('notificado_10d')),
+        _to_flag(record.get('notificado_5d')),
+        _to_flag(record.get('notificado_1d')),
+        # Só vale em colunas de conclusão; sem ela a conclusão é a da importação
+        _to_epoch(record.get('concluida_em'), line_number, 'concluida_em', utc=True),
+    )
+
+
+def import_tasks(db, path, fmt=None, progress=None):
+    # Tudo numa única transação: um erro em qualquer linha desfaz a importação
+    rows = (task_values(record, line_number) for line_number, record in read_task_records(path, fmt))
+    return db.bulk_insert_tasks(IMPORT_COLUMNS, chunked(rows), progress)
@@ -0,0 +1,151 @@
+import json
+import logging
+import os
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+
+# Liga a coleta desde a inicialização e grava snapshots no log rotativo
+PROFILE_ENV = "KANBAN_PROFILE"
+METRICS_LOG_FILE_NAME = "kanban_metrics.log"
+METRICS_LOG_MAX_BYTES = 1024 * 1024
+METRICS_LOG_BACKUPS = 3
+
+# Limites superiores (ms) dos buckets dos histogramas
+HISTOGRAM_BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('metrics', 'name', 'started')
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.observe(self.name, (time.perf_counter() - self.started) * 1000)
+        return False
+
+
+class Histogram:
+    __slots__ = ('buckets', 'count', 'total_ms', 'max_ms')
+
+    def __init__(self):
+        self.buckets = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, value_ms):
+        index = 0
+        while index < len(HISTOGRAM_BOUNDS_MS) and value_ms > HISTOGRAM_BOUNDS_MS[index]:
+            index += 1
+        self.buckets[index] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def percentile(self, fraction):
+        # Aproximação pelo limite superior do bucket que contém o percentil
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= target:
+                if index < len(HISTOGRAM_BOUNDS_MS):
+                    return min(HISTOGRAM_BOUNDS_MS[index], self.max_ms)
+                return self.max_ms
+        return self.max_ms
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'avg_ms': round(self.total_ms / self.count, 3) if self.count else 0.0,
+            'p50_ms': round(self.percentile(0.5), 3),
+            'p95_ms': round(self.percentile(0.95), 3),
+            'max_ms': round(self.max_ms, 3),
+            'buckets': dict(zip([str(bound) for bound in HISTOGRAM_BOUNDS_MS] + ['+inf'], self.buckets)),
+        }
+
+
+class Metrics:
+    # Desligado por padrão: span() devolve um context manager compartilhado que
+    # não faz nada, e incr()/observe() retornam na primeira linha.
+    def __init__(self):
+        self.enabled = False
+        self.counters = {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+        self._logger = None
+
+    def enable(self, log_path=None):
+        self.enabled = True
+        if log_path and self._logger is None:
+            handler = RotatingFileHandler(
+                log_path, maxBytes=METRICS_LOG_MAX_BYTES,
+                backupCount=METRICS_LOG_BACKUPS, encoding='utf-8'
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self._logger = logging.getLogger("kanban.metrics")
+            self._logger.propagate = False
+            self._logger.setLevel(logging.INFO)
+            self._logger.addHandler(handler)
+
+    def span(self, name):
+        if not self.enabled:
+            return NULL_SPAN
+        return _Span(self, name)
+
+    def incr(self, name, value=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name, value_ms):
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(value_ms)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'timestamp': time.strftime("%Y-%m-%d %H:%M:%S"),
+                'counters': dict(self.counters),
+                'histograms': {name: histogram.to_dict() for name, histogram in self.histograms.items()},
+            }
+
+    def flush(self):
+        if self._logger is not None and self.enabled:
+            self._logger.info(json.dumps(self.snapshot(), ensure_ascii=False))
+
+
+metrics = Metrics()
+
+
+def profiling_requested():
+    return os.environ.get(PROFILE_ENV, "").lower() in ("1", "true", "yes", "on")
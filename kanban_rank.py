@@ -0,0 +1,169 @@
+# Chaves de ordenação fracionárias (rank) para a posição manual dos cards.
+#
+# Uma chave é uma parte inteira de tamanho variável seguida de uma fração
+# opcional, tudo em base 62 com dígitos em ordem ASCII, de modo que a ordem
+# das strings (BINARY no SQLite, < no Python) é a ordem dos cards. O primeiro
+# caractere da parte inteira codifica o seu tamanho: 'a'..'z' para inteiros
+# positivos de 1 a 26 dígitos e 'Z'..'A' para os negativos. Assim, colocar
+# um card antes do primeiro ou depois do último só decrementa ou incrementa
+# a parte inteira, e colocar entre dois cards cria uma fração entre eles; em
+# nenhum caso outro card precisa ser renumerado.
+#
+# Baseado no algoritmo "fractional indexing" de David Greenspan.
+
+RANK_DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+FIRST_RANK = "a0"
+# Menor parte inteira representável; antes dela só cabem frações
+SMALLEST_INTEGER = "A" + "0" * 26
+
+
+def _integer_length(head):
+    if "a" <= head <= "z":
+        return ord(head) - ord("a") + 2
+    if "A" <= head <= "Z":
+        return ord("Z") - ord(head) + 2
+    raise ValueError(f"Chave de ordenação inválida: {head!r}")
+
+
+def _integer_part(key):
+    length = _integer_length(key[0])
+    if length > len(key):
+        raise ValueError(f"Chave de ordenação inválida: {key!r}")
+    return key[:length]
+
+
+def _validate(key):
+    if key == SMALLEST_INTEGER:
+        raise ValueError(f"Chave de ordenação inválida: {key!r}")
+    fraction = key[len(_integer_part(key)):]
+    if fraction.endswith("0"):
+        raise ValueError(f"Chave de ordenação inválida: {key!r}")
+
+
+def _increment_integer(integer):
+    head, digits = integer[0], list(integer[1:])
+    for i in range(len(digits) - 1, -1, -1):
+        value = RANK_DIGITS.index(digits[i]) + 1
+        if value < len(RANK_DIGITS):
+            digits[i] = RANK_DIGITS[value]
+            return head + "".join(digits)
+        digits[i] = "0"
+    # Estourou: a parte inteira ganha (ou perde, se negativa) um dígito
+    if head == "Z":
+        return "a0"
+    if head == "z":
+        return None
+    head = chr(ord(head) + 1)
+    if head > "a":
+        digits.append("0")
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def _decrement_integer(integer):
+    head, digits = integer[0], list(integer[1:])
+    for i in range(len(digits) - 1, -1, -1):
+        value = RANK_DIGITS.index(digits[i]) - 1
+        if value >= 0:
+            digits[i] = RANK_DIGITS[value]
+            return head + "".join(digits)
+        digits[i] = RANK_DIGITS[-1]
+    if head == "a":
+        return "Z" + RANK_DIGITS[-1]
+    if head == "A":
+        return None
+    head = chr(ord(head) - 1)
+    if head < "Z":
+        digits.append(RANK_DIGITS[-1])
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def _midpoint(a, b):
+    # Fração estritamente entre a e b ('' e None são os extremos)
+    if b:
+        n = 0
+        while (a[n] if n < len(a) else "0") == b[n]:
+            n += 1
+        if n > 0:
+            return b[:n] + _midpoint(a[n:], b[n:])
+
+    digit_a = RANK_DIGITS.index(a[0]) if a else 0
+    digit_b = RANK_DIGITS.index(b[0]) if b else len(RANK_DIGITS)
+    if digit_b - digit_a > 1:
+        return RANK_DIGITS[(digit_a + digit_b + 1) // 2]
+    if b and len(b) > 1:
+        return b[:1]
+    return RANK_DIGITS[digit_a] + _midpoint(a[1:], None)
+
+
+def rank_between(a, b):
+    # Nova chave estritamente entre a e b; None significa "sem vizinho"
+    if a is not None:
+        _validate(a)
+    if b is not None:
+        _validate(b)
+    if a is not None and b is not None and a >= b:
+        raise ValueError(f"Chaves fora de ordem: {a!r} >= {b!r}")
+
+    if a is None:
+        if b is None:
+            return FIRST_RANK
+        integer_b = _integer_part(b)
+        if integer_b == SMALLEST_INTEGER:
+            return integer_b + _midpoint("", b[len(integer_b):])
+        if integer_b < b:
+            return integer_b
+        decremented = _decrement_integer(integer_b)
+        if decremented is None:
+            raise ValueError("Não há chave de ordenação menor disponível")
+        return decremented
+
+    integer_a = _integer_part(a)
+    fraction_a = a[len(integer_a):]
+    if b is None:
+        incremented = _increment_integer(integer_a)
+        return integer_a + _midpoint(fraction_a, None) if incremented is None else incremented
+
+    integer_b = _integer_part(b)
+    if integer_a == integer_b:
+        return integer_a + _midpoint(fraction_a, b[len(integer_b):])
+    incremented = _increment_integer(integer_a)
+    if incremented is None:
+        raise ValueError("Não há chave de ordenação maior disponível")
+    if incremented < b:
+        return incremented
+    return integer_a + _midpoint(fraction_a, None)
+
+
+def ranks_between(a, b, count):
+    # count chaves crescentes entre a e b, divididas ao meio recursivamente
+    # para que nenhuma cresça mais que o necessário
+    if count <= 0:
+        return []
+    if count == 1:
+        return [rank_between(a, b)]
+    if b is None:
+        keys = [rank_between(a, None)]
+        while len(keys) < count:
+            keys.append(rank_between(keys[-1], None))
+        return keys
+    if a is None:
+        keys = [rank_between(None, b)]
+        while len(keys) < count:
+            keys.append(rank_between(None, keys[-1]))
+        keys.reverse()
+        return keys
+    middle = count // 2
+    key = rank_between(a, b)
+    return ranks_between(a, key, middle) + [key] + ranks_between(key, b, count - middle - 1)
+
+
+def rank_sequence(after=None):
+    # Chaves crescentes sem fim, a partir de after (exclusivo)
+    key = after
+    while True:
+        key = rank_between(key, None)
+        yield key
@@ -0,0 +1,230 @@
+import json
+
+from kanban_db import NOTIFICATION_COLUMNS, from_epoch
+
+TASK_FIELDS = (
+    'id', 'titulo', 'descricao', 'coluna', 'data_criacao', 'notificar_em',
+) + NOTIFICATION_COLUMNS + ('rank', 'concluida_em')
+DEADLINE_DISPLAY_FORMAT = '%d/%m/%Y %H:%M'
+
+# Só o quadro ativo é carregado e cada coluna dele em páginas, conforme a
+# rolagem, com paginação por chave (rank, id). Cada página sai em ordem pelo
+# índice (coluna, rank): nada é ordenado em Python.
+PAGE_SIZE = 200
+
+LOAD_FIRST_PAGE_SQL = f"""
+    SELECT {', '.join(TASK_FIELDS)} FROM tasks
+    WHERE coluna = ?
+    ORDER BY rank, id
+    LIMIT ?
+"""
+LOAD_NEXT_PAGE_SQL = f"""
+    SELECT {', '.join(TASK_FIELDS)} FROM tasks
+    WHERE coluna = ? AND (rank, id) > (?, ?)
+    ORDER BY rank, id
+    LIMIT ?
+"""
+# Mudanças depois de uma sequência; tarefas excluídas vêm com os campos nulos
+LOAD_CHANGES_SQL = f"""
+    SELECT c.seq, c.task_id, {', '.join('t.' + field for field in TASK_FIELDS)}
+    FROM tasks_changes c LEFT JOIN tasks t ON t.id = c.task_id
+    WHERE c.seq > ?
+    ORDER BY c.seq
+    LIMIT ?
+"""
+# Acima disso sai mais barato recarregar o quadro inteiro
+CHANGES_LIMIT = 2000
+LOAD_TASKS_BY_ID_SQL = f"""
+    SELECT {', '.join(TASK_FIELDS)} FROM tasks
+    WHERE id IN (SELECT value FROM json_each(?))
+"""
+
+
+class Task:
+    # Registro compacto de uma tarefa. As datas chegam do banco como inteiros
+    # (segundos desde a época) e nada é interpretado na carga; o texto do
+    # prazo é formatado no primeiro card que o pinta e fica guardado.
+    __slots__ = TASK_FIELDS + ('sort_key', '_deadline_text')
+
+    def __init__(self, id, titulo, descricao, coluna, data_criacao=None, notificar_em=None,
+                 notificado=0, notificado_10d=0, notificado_5d=0, notificado_1d=0, rank=None, concluida_em=None):
+        self.id = id
+        self.titulo = titulo
+        self.descricao = descricao
+        self.coluna = coluna
+        self.data_criacao = data_criacao
+        self.notificar_em = notificar_em
+        self.notificado = notificado
+        self.notificado_10d = notificado_10d
+        self.notificado_5d = notificado_5d
+        self.notificado_1d = notificado_1d
+        self.rank = rank
+        self.concluida_em = concluida_em
+
+        # Mesma ordem de Database.list_column_tasks: rank, id
+        self.sort_key = (rank or '', id)
+        self._deadline_text = None
+
+    @property
+    def deadline(self):
+        return from_epoch(self.notificar_em)
+
+    @property
+    def deadline_text(self):
+        if self._deadline_text is None:
+            if self.notificar_em is None:
+                self._deadline_text = ""
+            else:
+                self._deadline_text = self.deadline.strftime(DEADLINE_DISPLAY_FORMAT)
+        return self._deadline_text
+
+    @classmethod
+    def from_row(cls, row):
+        # Aceita sqlite3.Row ou dict (retrato do quadro)
+        return cls(
+            row['id'], row['titulo'], row['descricao'], row['coluna'], row['data_criacao'],
+            row['notificar_em'], row['notificado'], row['notificado_10d'],
+            row['notificado_5d'], row['notificado_1d'], row['rank'], row['concluida_em'],
+        )
+
+    def replace(self, **changes):
+        values = {field: getattr(self, field) for field in TASK_FIELDS}
+        values.update(changes)
+        return Task(**values)
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in TASK_FIELDS}
+
+    def __repr__(self):
+        return f"Task(id={self.id!r}, titulo={self.titulo!r}, coluna={self.coluna!r})"
+
+
+def _task_factory(cursor, values):
+    return Task(*values)
+
+
+def _task_cursor(db):
+    cursor = db.connection().cursor()
+    cursor.row_factory = _task_factory
+    return cursor
+
+
+def load_tasks(db, columns, page_size=PAGE_SIZE):
+    # Roda na thread do banco: a interface recebe os registros prontos. Os
+    # Task saem direto das tuplas do cursor, sem sqlite3.Row intermediário.
+    # De cada coluna vem só a primeira página.
+    tasks = []
+    for column in columns:
+        tasks.extend(load_page(db, column['id'], None, page_size))
+    return tasks
+
+
+def load_board(db, board_id=None):
+    # (sequência do log, quadro, colunas, tarefas), lidos no mesmo retrato do
+    # banco: o que mudar depois chega por load_changes. Um quadro que não
+    # existe mais dá lugar ao padrão.
+    conn = db.connection()
+    with conn:
+        conn.execute("BEGIN")
+        board = db.get_board(board_id) or db.get_board(None)
+        columns = [dict(column) for column in db.list_columns(board['id'])]
+        return db.change_sequence(), dict(board), columns, load_tasks(db, columns)
+
+
+def load_changes(db, after_sequence, limit=CHANGES_LIMIT):
+    # (última sequência, tarefas alteradas, ids excluídos); as listas vêm
+    # None quando há mais de limit mudanças
+    rows = db.connection().execute(LOAD_CHANGES_SQL, (after_sequence, limit + 1)).fetchall()
+    if len(rows) > limit:
+        return db.change_sequence(), None, None
+    tasks = []
+    deleted_ids = []
+    for row in rows:
+        if row[2] is None:
+            deleted_ids.append(row[1])
+        else:
+            tasks.append(Task(*tuple(row)[2:]))
+    return (rows[-1][0] if rows else after_sequence), tasks, deleted_ids
+
+
+def poll_changes(db, data_version, after_sequence):
+    # Consulta barata a cada ciclo; o log só é lido se outra conexão gravou
+    version = db.data_version()
+    if version == data_version:
+        return version, None
+    return version, load_changes(db, after_sequence)
+
+
+def load_page(db, coluna, after, page_size=PAGE_SIZE):
+    # after é o sort_key da última tarefa da página anterior (None = primeira)
+    if after is None:
+        return _task_cursor(db).execute(LOAD_FIRST_PAGE_SQL, (coluna, page_size)).fetchall()
+    return _task_cursor(db).execute(LOAD_NEXT_PAGE_SQL, (coluna,) + tuple(after) + (page_size,)).fetchall()
+
+
+def load_tasks_by_id(db, task_ids):
+    return _task_cursor(db).execute(LOAD_TASKS_BY_ID_SQL, (json.dumps(list(task_ids)),)).fetchall()
+
+
+def replay_operation(db, redo=False):
+    # Desfaz (ou refaz) a última operação do diário: (descrição, ids afetados,
+    # tarefas como ficaram), sem as que deixaram de existir; None se não há
+    # o que desfazer
+    result = db.redo() if redo else db.undo()
+    if result is None:
+        return None
+    descricao, task_ids = result
+    return descricao, task_ids, load_tasks_by_id(db, task_ids)
+
+
+class TaskStore:
+    # Cache central das tarefas do quadro: por id e, para cada coluna, uma
+    # lista em ordem crescente de sort_key (a ordem em que são exibidas).
+    def __init__(self):
+        self._by_id = {}
+        self._columns = {}
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def load(self, tasks):
+        self._by_id = {}
+        self._columns = {}
+        for task in tasks:
+            self._by_id[task.id] = task
+            self.column(task.coluna).append(task)
+
+    def get(self, task_id):
+        return self._by_id.get(task_id)
+
+    def column(self, coluna):
+        tasks = self._columns.get(coluna)
+        if tasks is None:
+            tasks = self._columns[coluna] = []
+        return tasks
+
+    def position(self, task):
+        # Busca binária na lista em ordem crescente de sort_key
+        tasks = self.column(task.coluna)
+        key = task.sort_key
+        lo, hi = 0, len(tasks)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if tasks[mid].sort_key < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def add(self, task):
+        row = self.position(task)
+        self.column(task.coluna).insert(row, task)
+        self._by_id[task.id] = task
+        return row
+
+    def discard(self, task_id):
+        task = self._by_id.pop(task_id, None)
+        if task is None:
+            return None
+        del self.column(task.coluna)[self.position(task)]
+        return task